@@ -3,10 +3,10 @@ from g12_1_salesinput import cal_quarter, get_region_name, has_bad_data, from_in
 from pathlib import Path
 import csv
 import re
+import g12_1_salesfile as sf
 from g12_1_salesfile import import_sales as file_import, already_imported, add_imported_file
 
 NAMING_CONVENTION = "sales_qn_yyyy_r.csv"
-SALES_FILE = Path("all_sales.csv")
 IMPORTED_FILES = "imported_files.txt"
 
 def view_sales(sales_list: list) -> bool:
@@ -40,9 +40,9 @@ def add_sales2(sales_list: list) -> None:
 
 def import_all_sales() -> list:
     sales_list = []
-    if not SALES_FILE.exists():
+    if not sf.CONFIG.sales_file.exists():
         return sales_list
-    with SALES_FILE.open("r") as file:
+    with sf.CONFIG.sales_file.open("r") as file:
         reader = csv.reader(file)
         for row in reader:
             try:
@@ -56,7 +56,7 @@ def import_all_sales() -> list:
 
 def import_sales(sales_list: list) -> None:
     file_name = input("Enter name of file to import: ").strip()
-    file_path = Path(__file__).parent.parent.parent / 'psc01_files' / file_name
+    file_path = sf.CONFIG.filepath / file_name
 
     match = re.match(r"^sales_q([1-4])_(\d{4})_([a-z])\.csv$", file_name)
     if not match:
@@ -82,7 +82,7 @@ def import_sales(sales_list: list) -> None:
         print("No valid sales to import.")
 
 def save_all_sales(sales_list, delimiter: str = ',') -> None:
-    with SALES_FILE.open("w", newline="") as file:
+    with sf.CONFIG.sales_file.open("w", newline="") as file:
         writer = csv.writer(file, delimiter=delimiter)
         for sale in sales_list:
             writer.writerow([sale['amount'], sale['sales_date'], sale['region']])
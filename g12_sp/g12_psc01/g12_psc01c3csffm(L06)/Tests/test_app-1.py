@@ -5,8 +5,19 @@ import unittest
 # and interacting with their input/output.
 import subprocess
 
+# Run the console application in this process against in-memory streams.
+import contextlib
+import importlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import traceback
+
 from pathlib import Path
-FILEPATH: Path = Path(__file__).parent.parent.parent / 'psc01_files'
+MODULE_DIR: Path = Path(__file__).parent.parent / 'Modules'
+FILEPATH: Path = Path(__file__).parent.parent.parent.parent / 'psc01_files'
 ALL_SALES: Path = FILEPATH / 'all_sales.csv'
 ALL_SALES_COPY: Path = FILEPATH / 'all_sales_copy.csv'
 IMPORTED_FILES: Path = FILEPATH / 'imported_files.txt'
@@ -17,8 +28,11 @@ TEST_APP_LOG: Path = Path('./test_app_log.txt')
 class TestSalesDataImporter(unittest.TestCase):
 
     def setUp(self):
-        """Set up the required content for testing"""
-        with open(ALL_SALES, "w", newline='') as f:
+        """Set up the required content for testing in a temporary data directory"""
+        if not hasattr(self, 'data_dir'):
+            self.data_dir = Path(tempfile.mkdtemp(prefix='sales_test_'))
+            self.addCleanup(shutil.rmtree, self.data_dir, ignore_errors=True)
+        with open(self.data_dir / ALL_SALES.name, "w", newline='') as f:
             f.write("12493.0,2020-12-22,w\n"
                     "13761.0,2021-09-15,e\n"
                     "9710.0,2021-05-15,e\n"
@@ -27,26 +41,53 @@ class TestSalesDataImporter(unittest.TestCase):
                     "12345.0,2020-04-17,m\n"
                     "2929.0,2021-04-10,w\n"
                     )
-        with open(IMPORTED_FILES, "w") as f:
+        with open(self.data_dir / IMPORTED_FILES.name, "w") as f:
             f.write("")
-
-
-    # def tearDown(self):
-    #     """Tear down the environment for testing"""
+        for sales_file in FILEPATH.glob('sales_q*.csv'):
+            shutil.copy(sales_file, self.data_dir)
 
 
     def run_app(self, input_data):
+        """
+        Runs the console application in this process with simulated user input.
+        Modules are imported once, so each case skips interpreter startup.
+        """
+        if str(MODULE_DIR) not in sys.path:
+            sys.path.insert(0, str(MODULE_DIR))
+        console = importlib.import_module(f'g{GID}_3_console')
+        salesfile = importlib.import_module(f'g{GID}_1_salesfile')
+
+        stdout, stderr = io.StringIO(), io.StringIO()
+        config, stdin = salesfile.CONFIG, sys.stdin
+        # Every file the application touches lives in this test's own directory,
+        # so test cases can run in parallel worker processes.
+        salesfile.CONFIG = salesfile.SalesConfig(self.data_dir, self.data_dir / ALL_SALES.name)
+        sys.stdin = io.StringIO(input_data)
+        try:
+            with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                try:
+                    console.execute_command()
+                except Exception:  # e.g. EOFError when the input runs out, as in the subprocess
+                    traceback.print_exc()
+        finally:
+            sys.stdin = stdin
+            salesfile.CONFIG = config
+        return stdout.getvalue(), stderr.getvalue()
+
+
+    def run_app_subprocess(self, input_data):
         """
         Simulates running the console application with user input.
         """
-        entry_point: str = f'g{GID}_4_main.py'
+        entry_point: Path = MODULE_DIR / f'g{GID}_4_main.py'
         print(f"{entry_point=}")
         # Start the process
         process = subprocess.Popen(
-             ["python", entry_point],
+             [sys.executable, entry_point],
             stdin=subprocess.PIPE,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
+            env={**os.environ, "SALES_DATA_DIR": str(self.data_dir)},
             text=True # ensures that input/output is handled as text (not bytes).
          )
         # Send input and get output
@@ -55,6 +96,17 @@ class TestSalesDataImporter(unittest.TestCase):
         return stdout, stderr
 
 
+    def test_smoke_subprocess(self):
+        """
+        Test that the entry point starts and exits as a separate process.
+        """
+        input_data = "exit\n"
+        stdout, stderr = self.run_app_subprocess(input_data)
+        print(f"{input_data=}\n{stdout=}\n{stderr=}\n")
+
+        self.assertIn("Saved sales records.", stdout)
+
+
     def test_exit_command(self):
         """
         Test the 'exit' command to terminate the application.
@@ -416,7 +416,7 @@ def execute_command() -> None:
                 "add1": add_sales1,
                 "add2": add_sales2,
                 "view": view_sales,
-                "menu": display_menu,
+                "menu": lambda sales_list: display_menu(),
                 }
     while True:
         action = input("\nPlease enter a command: ").strip().lower()
@@ -424,14 +424,9 @@ def execute_command() -> None:
             save_all_sales(sales_list)
             print("Saved sales records.")
             break
-        if action == "import":
-            commands[action](sales_list)
-        elif action in ("add1", "add2"):
-            commands[action](sales_list)
-        elif action == "view":
-            commands[action](sales_list)
-        elif action == "menu":
-            commands[action]()
+        command = commands.get(action)
+        if command:
+            command(sales_list)
         else:
             print("Invalid command. Please try again.\n")
             display_menu()
@@ -866,7 +861,7 @@ def execute_command() -> None:
                 "add1": add_sales1,
                 "add2": add_sales2,
                 "view": view_sales,
-                "menu": display_menu,
+                "menu": lambda sales_list: display_menu(),
                 }
     while True:
         action = input("\nPlease enter a command: ").strip().lower()
@@ -874,14 +869,9 @@ def execute_command() -> None:
             save_all_sales(sales_list)
             print("Saved sales records.")
             break
-        if action == "import":
-            commands[action](sales_list)
-        elif action in ("add1", "add2"):
-            commands[action](sales_list)
-        elif action == "view":
-            commands[action](sales_list)
-        elif action == "menu":
-            commands[action]()
+        command = commands.get(action)
+        if command:
+            command(sales_list)
         else:
             print("Invalid command. Please try again.\n")
             display_menu()
@@ -1304,7 +1294,7 @@ def execute_command() -> None:
                 "add1": add_sales1,
                 "add2": add_sales2,
                 "view": view_sales,
-                "menu": display_menu,
+                "menu": lambda sales_list: display_menu(),
                 }
     while True:
         action = input("\nPlease enter a command: ").strip().lower()
@@ -1312,14 +1302,9 @@ def execute_command() -> None:
             save_all_sales(sales_list)
             print("Saved sales records.")
             break
-        if action == "import":
-            commands[action](sales_list)
-        elif action in ("add1", "add2"):
-            commands[action](sales_list)
-        elif action == "view":
-            commands[action](sales_list)
-        elif action == "menu":
-            commands[action]()
+        command = commands.get(action)
+        if command:
+            command(sales_list)
         else:
             print("Invalid command. Please try again.\n")
             display_menu()
@@ -1,8 +1,29 @@
 from pathlib import Path
+from dataclasses import dataclass
+import os
 import csv
 import re
 
-IMPORTED_FILE = Path(__file__).parent.parent.parent / 'psc01_files' / 'imported_files.txt'
+@dataclass
+class SalesConfig:
+    filepath: Path = Path(__file__).parent.parent.parent / 'psc01_files'  # sales files to import
+    sales_file: Path = Path("all_sales.csv")
+    imported_file: Path = None
+
+    def __post_init__(self) -> None:
+        if self.imported_file is None:
+            self.imported_file = self.filepath / 'imported_files.txt'
+
+    @classmethod
+    def from_env(cls) -> "SalesConfig":
+        """Use SALES_DATA_DIR, when set, for all of the files."""
+        data_dir = os.environ.get("SALES_DATA_DIR")
+        if not data_dir:
+            return cls()
+        return cls(Path(data_dir), Path(data_dir) / 'all_sales.csv')
+
+CONFIG = SalesConfig.from_env()
+
 REGIONS = ('w', 'm', 'c', 'e')
 
 def is_valid_filename_format(filename: str) -> bool:
@@ -10,14 +31,14 @@ def is_valid_filename_format(filename: str) -> bool:
     return re.match(pattern, filename) is not None
 
 def already_imported(file_path: Path) -> bool:
-    if not IMPORTED_FILE.exists():
+    if not CONFIG.imported_file.exists():
         return False
-    with IMPORTED_FILE.open("r") as file:
+    with CONFIG.imported_file.open("r") as file:
         imported_files = [line.strip() for line in file.readlines()]
     return str(file_path.name) in imported_files
 
 def add_imported_file(file_path: Path) -> None:
-    with IMPORTED_FILE.open("a") as file:
+    with CONFIG.imported_file.open("a") as file:
         file.write(f"{file_path.name}\n")
 
 def import_sales(file_path: Path) -> list:
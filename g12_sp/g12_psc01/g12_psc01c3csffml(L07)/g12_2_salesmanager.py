@@ -3,13 +3,13 @@
 from g12_1_salesinput import cal_quarter, get_region_name, has_bad_data, from_input1, from_input2
 from pathlib import Path
 import csv
-from decimal import Decimal, ROUND_HALF_UP
 import locale as lc
+import g12_1_salesfile as sf
+from g12_1_salesrender import format_amounts, format_cents
 from g12_1_salesfile import import_sales, already_imported, add_imported_file
 
 lc.setlocale(lc.LC_ALL, "en_US")
 
-SALES_FILE = Path("all_sales.csv")
 
 def add_sales1(sales_list: list) -> None:
     print("Enter sales information:")
@@ -34,24 +34,22 @@ def view_sales(sales_list: list) -> bool:
         print("No sales to view.")
         return False
 
-    print(f"{'Date':>10} {'Quarter':>14} {'Region':>18} {'Amount':>18}")
-    print("-" * 70)
-    total = Decimal('0.00')
-    for i, sale in enumerate(sales_list, 1):
-        amount = Decimal(str(sale['amount'])).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+    amounts, total = format_amounts(sale['amount'] for sale in sales_list)
+    lines = [f"{'Date':>10} {'Quarter':>14} {'Region':>18} {'Amount':>18}", "-" * 70]
+    for i, (sale, amount) in enumerate(zip(sales_list, amounts), 1):
         date = sale['sales_date']
         quarter = cal_quarter(int(date[5:7]))
         region_name = get_region_name(sale['region'])
-        print(f"{i:>2}. {date:>10} {quarter:>14} {region_name:>18} {amount:>18,.2f}")
-        total += amount
-    print("-" * 70)
-    print(f"{'TOTAL':>60} {total:>10,.2f}")
+        lines.append(f"{i:>2}. {date:>10} {quarter:>14} {region_name:>18} {amount:>18}")
+    lines.append("-" * 70)
+    lines.append(f"{'TOTAL':>60} {format_cents(total):>10}")
+    print("\n".join(lines))
     return True
 
 def import_sales_wrapper(sales_list: list) -> None:
     print("Enter name of file to import:")  # Placed on separate line for subprocess visibility
     file_name = input().strip()
-    file_path = Path(__file__).parent.parent.parent / 'psc01_files' / file_name
+    file_path = sf.CONFIG.filepath / file_name
     if already_imported(file_path):
         print(f"File '{file_name}' has already been imported.")
         return
@@ -65,8 +63,8 @@ def import_sales_wrapper(sales_list: list) -> None:
 
 def import_all_sales() -> list:
     sales = []
-    if SALES_FILE.exists():
-        with SALES_FILE.open("r", newline="") as file:
+    if sf.CONFIG.sales_file.exists():
+        with sf.CONFIG.sales_file.open("r", newline="") as file:
             reader = csv.DictReader(file)
             for row in reader:
                 try:
@@ -78,7 +76,7 @@ def import_all_sales() -> list:
     return sales
 
 def save_all_sales(sales_list: list, delimiter: str = ',') -> None:
-    with SALES_FILE.open("w", newline="") as file:
+    with sf.CONFIG.sales_file.open("w", newline="") as file:
         fieldnames = ["amount", "sales_date", "region"]
         writer = csv.DictWriter(file, fieldnames=fieldnames, delimiter=delimiter)
         writer.writeheader()
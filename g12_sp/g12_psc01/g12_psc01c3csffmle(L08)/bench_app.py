@@ -0,0 +1,163 @@
+import sys
+import csv
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import contextlib
+import io
+from datetime import date, timedelta
+from pathlib import Path
+
+import g12_1_salesfile as sf
+import g12_2_salesmanager as sm
+from g12_1_salesrender import parse_cents
+
+L10_DIR: Path = Path(__file__).parent.parent / 'g12_psc01c6oopdbgui(L10)'
+SALES_DB: Path = Path(__file__).parent.parent.parent / 'psc01_db' / 'sales_db.sqlite'
+BASELINE_FILE: Path = Path(__file__).parent / 'bench_baseline.json'  # machine-specific, so gitignored
+REGIONS = ('w', 'm', 'c', 'e')
+
+
+def quarter_dates(quarter: int, year: int) -> tuple[date, int]:
+    """First day of the quarter and its length in days."""
+    start = date(year, 3 * quarter - 2, 1)
+    end = date(year + 1, 1, 1) if quarter == 4 else date(year, 3 * quarter + 1, 1)
+    return start, (end - start).days
+
+
+def generate_sales_rows(quarter: int, year: int, region: str, rows: int,
+                        bad_ratio: float = 0.0, seed: int = 0) -> list[list[str]]:
+    """Deterministic rows in the sales_qN_yyyy_r.csv layout, with a share of bad rows."""
+    rng = random.Random(f"{seed}-{quarter}-{year}-{region}")
+    start, days = quarter_dates(quarter, year)
+    bad_rows = (
+        lambda amount, day: [f"{amount[:2]}-{amount[2:]}", day, region],  # bad amount
+        lambda amount, day: [amount, f"{year}-13-{rng.randint(32, 99)}", region],  # bad date
+        lambda amount, day: [amount, day],  # missing field
+    )
+    data = []
+    for _ in range(rows):
+        amount = f"{rng.randint(100, 5_000_000) / 100:.2f}"
+        day = (start + timedelta(days=rng.randrange(days))).isoformat()
+        if rng.random() < bad_ratio:
+            data.append(rng.choice(bad_rows)(amount, day))
+        else:
+            data.append([amount, day, region])
+    return data
+
+
+def generate_sales_file(dir_path: Path, quarter: int, year: int, region: str, rows: int,
+                        bad_ratio: float = 0.0, seed: int = 0) -> Path:
+    file_path = dir_path / f"sales_q{quarter}_{year}_{region}.csv"
+    with file_path.open("w", newline="") as file:
+        csv.writer(file).writerows(generate_sales_rows(quarter, year, region, rows, bad_ratio, seed))
+    return file_path
+
+
+def best_time(func, repeat: int) -> float:
+    """Best wall time of `repeat` calls, with the functions' console output discarded."""
+    best = float("inf")
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_csv(tmp: Path, rows: int, bad_ratio: float, seed: int, repeat: int) -> dict:
+    sales_file = generate_sales_file(tmp, 4, 2021, 'w', rows, bad_ratio, seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        sales = sf.import_sales(sales_file)
+
+    sf.CONFIG = sf.SalesConfig(tmp, tmp / 'all_sales.csv')
+    sm.save_all_sales(sales)
+
+    return {
+        "import_sales": best_time(lambda: sf.import_sales(sales_file), repeat),
+        "import_all_sales": best_time(sm.import_all_sales, repeat),
+        "view_sales": best_time(lambda: sm.view_sales(sales), repeat),
+        "save_all_sales": best_time(lambda: sm.save_all_sales(sales), repeat),
+    }
+
+
+def bench_sqlite(tmp: Path, rows: int, seed: int, repeat: int, lookups: int = 200) -> dict:
+    sys.path.insert(0, str(L10_DIR))
+    from g12_2_2salesdb import SQLiteDBAccess
+    import sqlite3
+
+    db_file = tmp / 'sales_db.sqlite'
+    shutil.copyfile(SALES_DB, db_file)
+    db = SQLiteDBAccess(db_file.name, tmp)
+    db.migrate_schema()  # measure the amountCents path the app reads and writes
+    data = [row for q in range(1, 5) for row in generate_sales_rows(q, 2022, REGIONS[q - 1], rows // 4, seed=seed)]
+    with sqlite3.connect(db_file) as conn:
+        conn.executemany("INSERT INTO Sales (amount, amountCents, salesDate, region) VALUES (?, ?, ?, ?)",
+                         [(cents / 100, cents, day, region)
+                          for cents, day, region in ((parse_cents(amount), day, region) for amount, day, region in data)])
+    conn.close()
+
+    rng = random.Random(seed)
+    keys = [(date.fromisoformat(day), region) for _, day, region in rng.sample(data, min(lookups, len(data)))]
+    found = [s for s in (db.retrieve_sales_by_date_region(d, r) for d, r in keys) if s]
+
+    def update_all():
+        for sales in found:
+            db.update_sales(sales)
+
+    return {
+        "sqlite_retrieve_sales_by_date_region": best_time(
+            lambda: [db.retrieve_sales_by_date_region(d, r) for d, r in keys], repeat),
+        "sqlite_update_sales": best_time(update_all, repeat),
+        "sqlite_retrieve_regions": best_time(db.retrieve_regions, repeat),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for name, seconds in results.items():
+        base = baseline.get(name)
+        if base and seconds > base * (1 + tolerance):
+            regressions.append(f"{name}: {seconds:.4f}s vs baseline {base:.4f}s ({seconds / base - 1:+.0%})")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the sales data importer.")
+    parser.add_argument("--rows", type=int, default=50_000, help="rows per generated file")
+    parser.add_argument("--bad-ratio", type=float, default=0.05, help="share of bad rows in generated files")
+    parser.add_argument("--seed", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark, best is kept")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before flagging")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp = Path(tmp_dir)
+        results = bench_csv(tmp, args.rows, args.bad_ratio, args.seed, args.repeat)
+        results.update(bench_sqlite(tmp, args.rows, args.seed, args.repeat))
+
+    for name, seconds in results.items():
+        print(f"{name:40} {seconds * 1000:>12.2f} ms")
+
+    if args.save_baseline or not args.baseline.exists():
+        args.baseline.write_text(json.dumps({"rows": args.rows, "results": results}, indent=2))
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text())
+    if baseline.get("rows") != args.rows:
+        print(f"Baseline was recorded with {baseline.get('rows')} rows; not comparing.")
+        return 0
+    regressions = compare(results, baseline["results"], args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
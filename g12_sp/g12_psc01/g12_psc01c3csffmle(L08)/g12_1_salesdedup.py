@@ -0,0 +1,58 @@
+from datetime import date
+from typing import Union
+
+class DedupIndex:
+    """Opt-in duplicate check for sales, keyed on (date ordinal, region, cents).
+
+    load() indexes the sales already held, then add() and keep_new() reject
+    any sale whose key is already present with one set lookup per row.
+    Rejections are counted per source (a file name, 'add1', ...) for report().
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self._keys: set[tuple[Union[int, str], str, int]] = set()
+        self._checked = 0
+        self._duplicates: dict[str, int] = {}
+
+    @staticmethod
+    def key(sale: dict) -> tuple[Union[int, str], str, int]:
+        # The date is split the way has_bad_date() reads it, so 2021-1-5 and
+        # 2021-01-05 are the same day; one that isn't a real date keys on its text
+        try:
+            day = date(*map(int, sale["sales_date"].split("-"))).toordinal()
+        except (TypeError, ValueError):
+            day = sale["sales_date"]
+        return day, sale["region"], sale["amount"]
+
+    def load(self, sales_list: list) -> None:
+        """Start over from the sales already held; duplicates among them are kept."""
+        self._keys = {self.key(sale) for sale in sales_list}
+        self._checked = 0
+        self._duplicates.clear()
+
+    def add(self, sale: dict, source: str) -> bool:
+        """Index the sale and return True, or count it and return False if it is a duplicate."""
+        self._checked += 1
+        key = self.key(sale)
+        if key in self._keys:
+            self._duplicates[source] = self._duplicates.get(source, 0) + 1
+            return False
+        self._keys.add(key)
+        return True
+
+    def keep_new(self, sales: list, source: str) -> list:
+        return [sale for sale in sales if self.add(sale, source)]
+
+    def report(self) -> dict:
+        return {"checked": self._checked,
+                "duplicates": sum(self._duplicates.values()),
+                "by_source": dict(self._duplicates)}
+
+    def print_report(self) -> None:
+        report = self.report()
+        print(f"Duplicate check: {report['duplicates']} of {report['checked']} sales rejected as duplicates.")
+        for source, count in report["by_source"].items():
+            print(f"    {source}: {count}")
+
+DEDUP = DedupIndex()
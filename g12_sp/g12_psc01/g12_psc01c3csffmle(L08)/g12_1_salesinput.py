@@ -1,10 +1,11 @@
 from typing import Optional
 import calendar
+from g12_1_salesrender import parse_cents
 
-def input_amount() -> float:
+def input_amount() -> int:
     while True:
         try:
-            amount = float(input("Amount:             "))
+            amount = parse_cents(input("Amount:             "))
             if amount > 0:
                 return amount
             else:
@@ -34,20 +35,23 @@ def input_day(year: int, month: int) -> int:
     max_day = cal_max_day(year, month)
     return input_int("Day", max_day, 1)
 
+def date_error(entry: str) -> Optional[str]:
+    """Why `entry` is not a usable yyyy-mm-dd sales date, or None when it is."""
+    if len(entry) == 10 and entry[4] == '-' and entry[7] == '-' and entry[:4].isdigit() and entry[5:7].isdigit() and entry[8:].isdigit():
+        yyyy, mm, dd = int(entry[:4]), int(entry[5:7]), int(entry[8:])
+        if (1 <= mm <= 12) and (1 <= dd <= cal_max_day(yyyy, mm)):
+            if 2000 <= yyyy <= 2999:
+                return None
+            return "Year of the date must be between 2000 and 2999."
+    return f"{entry} is not in a valid date format."
+
 def input_date() -> str:
     while True:
         entry = input(f"{'Date (yyyy-mm-dd):':20}").strip()
-        if len(entry) == 10 and entry[4] == '-' and entry[7] == '-' and entry[:4].isdigit() and entry[5:7].isdigit() and entry[8:].isdigit():
-            yyyy, mm, dd = int(entry[:4]), int(entry[5:7]), int(entry[8:])
-            if (1 <= mm <= 12) and (1 <= dd <= cal_max_day(yyyy, mm)):
-                if 2000 <= yyyy <= 2999:
-                    return entry
-                else:
-                    print("Year of the date must be between 2000 and 2999.")
-            else:
-                print(f"{entry} is not in a valid date format.")
-        else:
-            print(f"{entry} is not in a valid date format.")
+        error = date_error(entry)
+        if error is None:
+            return entry
+        print(error)
 
 def input_region_code() -> Optional[str]:
     valid_codes = ('w', 'm', 'c', 'e')
@@ -101,3 +105,20 @@ def from_input2() -> dict:
     date = input_date()
     region = input_region_code()
     return {"amount": amount, "sales_date": date, "region": region}
+
+def from_args(amount: str, sales_date: str, region: str) -> dict:
+    """A sale from values given up front (batch mode) instead of prompted for.
+    Raises ValueError with the same messages the prompts would show."""
+    try:
+        cents = parse_cents(amount)
+    except ValueError:
+        raise ValueError(f"Invalid number: {amount}") from None
+    if cents <= 0:
+        raise ValueError("Amount must be greater than zero.")
+    error = date_error(sales_date.strip())
+    if error:
+        raise ValueError(error)
+    region = region.lower()
+    if not is_valid_region(region):
+        raise ValueError(f"Region must be one of the following: {('w', 'm', 'c', 'e')}.")
+    return {"amount": cents, "sales_date": sales_date.strip(), "region": region}
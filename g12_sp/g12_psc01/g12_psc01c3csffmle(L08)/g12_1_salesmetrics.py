@@ -0,0 +1,66 @@
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+import json
+import time
+
+class SalesMetrics:
+    """Opt-in per-stage timers and counters for the import pipeline.
+
+    While disabled, stage() and count() return immediately, so the
+    instrumented functions cost only a flag check.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self._stages: dict[str, dict] = {}
+        self._counters: dict[str, int] = {}
+
+    def reset(self) -> None:
+        self._stages.clear()
+        self._counters.clear()
+
+    @contextmanager
+    def stage(self, name: str):
+        if not self.enabled:
+            yield
+            return
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            stats = self._stages.setdefault(name, {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0})
+            stats["calls"] += 1
+            stats["wall_s"] += time.perf_counter() - wall_start
+            stats["cpu_s"] += time.process_time() - cpu_start
+
+    def timed(self, name: str):
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with self.stage(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def count(self, name: str, n: int = 1) -> None:
+        if self.enabled:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def to_dict(self) -> dict:
+        return {"stages": {name: dict(stats) for name, stats in self._stages.items()},
+                "counters": dict(self._counters)}
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2)
+
+    def export_json(self, file_path: Path) -> None:
+        try:
+            with Path(file_path).open("w") as file:
+                file.write(self.to_json())
+        except OSError as e:
+            print(f"Error exporting metrics: {e}")
+
+METRICS = SalesMetrics()
@@ -0,0 +1,32 @@
+from decimal import Decimal, ROUND_HALF_UP
+
+CENT = Decimal('0.01')
+EXACT_CENTS = 2 ** 46 * 100  # below this, cents / 100 is off by under 0.004, so .2f rounds back to the cents
+
+def amount_to_cents(amount) -> int:
+    """Whole cents, rounded half up, the same as Decimal(str(amount)).quantize(CENT, ROUND_HALF_UP).
+
+    Plain decimal text such as '13761.0' or '9710.125' is rounded by looking at
+    its digits; anything else (exponents, signs, odd types) goes through Decimal.
+    """
+    text = str(amount)
+    whole, _, frac = text.partition('.')
+    if whole.isascii() and whole.isdigit() and (not frac or (frac.isascii() and frac.isdigit())):
+        frac += "000"
+        return int(whole) * 100 + int(frac[:2]) + (frac[2] >= '5')
+    return int(Decimal(text).quantize(CENT, rounding=ROUND_HALF_UP).scaleb(2))
+
+def parse_cents(text: str) -> int:
+    """Cents for an amount typed or read from a file; ValueError if it isn't a finite number."""
+    try:
+        return amount_to_cents(text.strip())
+    except ArithmeticError:  # decimal.InvalidOperation
+        raise ValueError(f"could not convert string to cents: {text!r}") from None
+
+def format_cents(cents: int, grouping: bool = True) -> str:
+    """'1,234.56' for 123456, the same text as format(Decimal('1234.56'), ',.2f').
+    Without grouping it is '1234.56', the form amounts are saved in."""
+    if -EXACT_CENTS < cents < EXACT_CENTS:
+        return f"{cents / 100:,.2f}" if grouping else f"{cents / 100:.2f}"
+    whole, frac = divmod(abs(cents), 100)
+    return f"{'-' if cents < 0 else ''}{whole:{',' if grouping else ''}}.{frac:02d}"
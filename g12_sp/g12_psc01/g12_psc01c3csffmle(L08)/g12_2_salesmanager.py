@@ -1,117 +1,148 @@
-from g12_1_salesinput import cal_quarter, get_region_name, has_bad_data, from_input1, from_input2, is_valid_region
-from pathlib import Path
+from g12_1_salesinput import cal_quarter, get_region_name, has_bad_data, from_input1, from_input2
 import csv
 import re
-from decimal import Decimal, ROUND_HALF_UP
 import locale as lc
 import g12_1_salesfile as sf
-from g12_1_salesfile import import_sales as file_import, is_valid_filename_format, already_imported, add_imported_file
+from g12_1_salesrender import format_cents, parse_cents
+from g12_1_salesfile import import_sales as file_import, already_imported, add_imported_file
+from g12_1_salesmetrics import METRICS
+from g12_1_salesdedup import DEDUP
 
 lc.setlocale(lc.LC_ALL, "en_US")
 
 NAMING_CONVENTION = "sales_qn_yyyy_r.csv"
-SALES_FILE = Path("all_sales.csv")
 IMPORTED_FILES = "imported_files.txt"
 
-def add_sales1(sales_list: list) -> None:
-    print("Enter sales information:")
-    sale = from_input1()
+def add_sale(sales_list: list, sale: dict, source: str = "add") -> bool:
     if has_bad_data(sale):
         print("Invalid data. Sale not added.")
-        return
+        return False
+    if DEDUP.enabled and not DEDUP.add(sale, source):
+        print(f"Sales for {sale['sales_date']} is a duplicate. Sale not added.")
+        return False
     sales_list.append(sale)
     print(f"Sales for {sale['sales_date']} is added.")
+    return True
+
+def add_sales1(sales_list: list) -> None:
+    print("Enter sales information:")
+    add_sale(sales_list, from_input1(), "add1")
 
 def add_sales2(sales_list: list) -> None:
     print("Enter sales information:")
-    sale = from_input2()
-    if has_bad_data(sale):
-        print("Invalid data. Sale not added.")
-        return
-    sales_list.append(sale)
-    print(f"Sales for {sale['sales_date']} is added.")
+    add_sale(sales_list, from_input2(), "add2")
 
 def view_sales(sales_list: list) -> bool:
     if not sales_list:
         print("No sales to view.")
         return False
 
-    print(f"{'Date':>10} {'Quarter':>12} {'Region':>15} {'Amount':>20}")
-    print("-" * 65)
-    total = Decimal('0.00')
+    lines = [f"{'Date':>10} {'Quarter':>12} {'Region':>15} {'Amount':>20}", "-" * 65]
+    total = 0
     for i, sale in enumerate(sales_list, 1):
-        amount = Decimal(str(sale['amount'])).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
         date = sale['sales_date']
         quarter = cal_quarter(int(date[5:7]))
         region_name = get_region_name(sale['region'])
-        print(f"{i:>2}. {date:>10} {quarter:>12} {region_name:>15} {amount:>20,.2f}")
-        total += amount
-    print("-" * 65)
-    print(f"{'TOTAL':>52} {total:>13,.2f}")
+        lines.append(f"{i:>2}. {date:>10} {quarter:>12} {region_name:>15} {format_cents(sale['amount']):>20}")
+        total += sale['amount']
+    lines.append("-" * 65)
+    lines.append(f"{'TOTAL':>52} {format_cents(total):>13}")
+    print("\n".join(lines))
     return True
 
-def import_sales(sales_list: list) -> None:
-    file_name = input("Enter name of file to import: ").strip()
-    file_path = Path(__file__).parent.parent.parent / 'psc01_files' / file_name
+def import_sales(sales_list: list, file_name: str = None) -> bool:
+    """Import one sales file into sales_list, asking for its name unless given.
+    True when the file was imported."""
+    if file_name is None:
+        file_name = input("Enter name of file to import: ")
+    file_name = file_name.strip()
+    file_path = sf.CONFIG.filepath / file_name
 
     match = re.match(r"^sales_q([1-4])_(\d{4})_([a-z])\.csv$", file_name)
     if not match:
         print(f"Filename '{file_name}' doesn't follow the expected format of {NAMING_CONVENTION}.")
-        return
+        return False
 
     region_code = match.group(3)
     valid_codes = ('w', 'm', 'c', 'e')
     if region_code not in valid_codes:
         print(f"Filename '{file_name}' doesn't include one of the following region codes: {list(valid_codes)}.")
-        return
+        return False
 
     if already_imported(file_path):
         print(f"File '{file_name}' has already been imported.")
-        return
+        return False
 
     try:
         new_sales = file_import(file_path)
+        if new_sales and DEDUP.enabled:
+            found = len(new_sales)
+            new_sales = DEDUP.keep_new(new_sales, file_name)
+            if len(new_sales) < found:
+                print(f"Skipped {found - len(new_sales)} duplicate sales.")
+            if not new_sales:
+                add_imported_file(file_path)
+                print("No new sales to import.")
+                return True
         if new_sales:
             sales_list.extend(new_sales)
             add_imported_file(file_path)
             print("Imported sales added to list.")
-        else:
-            print("No valid sales to import.")
+            return True
+        print("No valid sales to import.")
     except Exception as e:
         print(type(e), f". Fail to import sales from '{file_name}'.")
+    return False
 
-def import_all_sales() -> list:
+@METRICS.timed("import_all_sales")
+def import_all_sales(strict: bool = False) -> list:
+    """The sales held in all_sales.csv. A file that can't be read is reported
+    and treated as empty, or with `strict` the error is raised instead, for
+    callers that would otherwise save an empty list over it."""
     sales = []
-    if SALES_FILE.exists():
+    if sf.CONFIG.sales_file.exists():
+        rows = 0
         try:
-            with SALES_FILE.open("r", newline="") as file:
+            with sf.CONFIG.sales_file.open("r", newline="") as file:
                 reader = csv.DictReader(file)
                 for row in reader:
+                    rows += 1
                     try:
-                        row['amount'] = float(row['amount'])
+                        row['amount'] = parse_cents(row['amount'])
                         if not has_bad_data(row):
                             sales.append(row)
                     except:
                         continue
         except Exception as e:
+            if strict:
+                raise
             print(f"Error reading sales file: {e}")
+        if METRICS.enabled:
+            METRICS.count("bytes_read", sf.CONFIG.sales_file.stat().st_size)
+            METRICS.count("rows_parsed", rows)
+            METRICS.count("rows_rejected", rows - len(sales))
     return sales
 
-def save_all_sales(sales_list: list, delimiter: str = ',') -> None:
+@METRICS.timed("save_all_sales")
+def save_all_sales(sales_list: list, delimiter: str = ',') -> bool:
+    """Write every sale to all_sales.csv. Returns False, after reporting the
+    error, if the file couldn't be written."""
     try:
-        with SALES_FILE.open("w", newline="") as file:
+        with sf.CONFIG.sales_file.open("w", newline="") as file:
             fieldnames = ["amount", "sales_date", "region"]
             writer = csv.DictWriter(file, fieldnames=fieldnames, delimiter=delimiter)
             writer.writeheader()
             for sale in sales_list:
-                writer.writerow(sale)
+                writer.writerow({**sale, "amount": format_cents(sale["amount"], grouping=False)})
+        return True
     except Exception as e:
         print(f"Error saving sales file: {e}")
+        return False
 
 def initialize_content_of_files(delimiter: str = ',') -> None:
-    if not SALES_FILE.exists():
+    if not sf.CONFIG.sales_file.exists():
         try:
-            with SALES_FILE.open("w", newline="") as file:
+            with sf.CONFIG.sales_file.open("w", newline="") as file:
                 fieldnames = ["amount", "sales_date", "region"]
                 writer = csv.DictWriter(file, fieldnames=fieldnames, delimiter=delimiter)
                 writer.writeheader()
@@ -120,7 +151,7 @@ def initialize_content_of_files(delimiter: str = ',') -> None:
 
 def raise_exception() -> None:
     try:
-        with open(sf.SALES_FILE, 'w', newline='') as csvfile:
+        with open(sf.CONFIG.sales_file, 'w', newline='') as csvfile:
             raise OSError("Artificial OSError raised for test.")
     except OSError as e:
         print("Is the file closed yet?", csvfile.closed)
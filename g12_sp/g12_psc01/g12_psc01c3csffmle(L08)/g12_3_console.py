@@ -1,46 +1,122 @@
-from g12_2_salesmanager import view_sales, add_sales1, add_sales2, import_sales, import_all_sales, save_all_sales, raise_exception
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional
+import shlex
+from g12_1_salesinput import from_args
+from g12_1_salesdedup import DEDUP
+from g12_2_salesmanager import view_sales, add_sale, add_sales1, add_sales2, import_sales, import_all_sales, save_all_sales, raise_exception
+
+@dataclass(frozen=True)
+class Command:
+    """One console command. `run` takes the sales list and prompts for what it
+    needs; `run_args` takes the sales list plus the words that followed the
+    command in a script and returns False on failure. A command without
+    `run_args` takes no arguments in a script and is run through `run`."""
+    help: str
+    run: Callable[[list], object]
+    run_args: Optional[Callable[[list, list], bool]] = None
+    usage: str = ""
+    nargs: int = 0
+    stop: bool = False
 
 def display_title() -> None:
     print("SALES DATA IMPORTER")
 
 def display_menu() -> None:
-    print("""
-COMMAND MENU
-view   - View all sales
-add1   - Add sales by typing sales, year, month, day, and region
-add2   - Add sales by typing sales, date (YYYY-MM-DD), and region
-import - Import sales from file
-menu   - Show menu
-test   - Test an exception
-exit   - Exit program
-""")
+    print("\nCOMMAND MENU")
+    for name, command in COMMANDS.items():
+        print(f"{name:6} - {command.help}")
+    print()
+
+def test_exception(sales_list: list) -> None:
+    try:
+        raise_exception()
+    except:
+        pass
+
+def exit_program(sales_list: list) -> None:
+    if DEDUP.enabled:
+        DEDUP.print_report()
+    save_all_sales(sales_list)
+    print("Saved sales records.\nBye!")
+
+def add_sales1_args(sales_list: list, args: list) -> bool:
+    amount, year, month, day, region = args
+    if not (year.isdigit() and month.isdigit() and day.isdigit()):
+        raise ValueError("Year, month and day must be integers.")
+    return add_sale(sales_list, from_args(amount, f"{int(year):04d}-{int(month):02d}-{int(day):02d}", region), "add1")
+
+def add_sales2_args(sales_list: list, args: list) -> bool:
+    return add_sale(sales_list, from_args(*args), "add2")
+
+COMMANDS: dict[str, Command] = {
+    "view": Command("View all sales", view_sales, lambda sales_list, args: view_sales(sales_list) or True),
+    "add1": Command("Add sales by typing sales, year, month, day, and region", add_sales1,
+                    add_sales1_args, "add1 AMOUNT YEAR MONTH DAY REGION", 5),
+    "add2": Command("Add sales by typing sales, date (YYYY-MM-DD), and region", add_sales2,
+                    add_sales2_args, "add2 AMOUNT YYYY-MM-DD REGION", 3),
+    "import": Command("Import sales from file", import_sales,
+                      lambda sales_list, args: import_sales(sales_list, *args), "import FILENAME", 1),
+    "menu": Command("Show menu", lambda sales_list: display_menu()),
+    "test": Command("Test an exception", test_exception),
+    "exit": Command("Exit program", exit_program, stop=True),
+}
 
 def execute_command() -> None:
     sales_list = import_all_sales()
+    if DEDUP.enabled:
+        DEDUP.load(sales_list)
     display_title()
     display_menu()
 
     while True:
-        command = input("Please enter a command: ").lower()
-        if command == "view":
-            view_sales(sales_list)
-        elif command == "add1":
-            add_sales1(sales_list)
-        elif command == "add2":
-            add_sales2(sales_list)
-        elif command == "import":
-            import_sales(sales_list)
-        elif command == "menu":
-            display_menu()
-        elif command == "test":
-            try:
-                raise_exception()
-            except:
-                pass
-        elif command == "exit":
-            save_all_sales(sales_list)
-            print("Saved sales records.\nBye!")
-            break
-        else:
+        command = COMMANDS.get(input("Please enter a command: ").lower())
+        if command is None:
             print("    Invalid command. Please try again.")
             display_menu()
+            continue
+        command.run(sales_list)
+        if command.stop:
+            break
+
+def run_batch(lines: Iterable[str]) -> int:
+    """Run scripted commands without prompting, e.g. 'import sales_q4_2021_w.csv'
+    or 'add2 13761 2021-10-15 w', one per line; blank lines and '#' comments are
+    skipped. Sales are saved once at the end, or at 'exit'. Returns the number of
+    lines that failed."""
+    sales_list = import_all_sales()
+    if DEDUP.enabled:
+        DEDUP.load(sales_list)
+    failures = 0
+    for line_no, line in enumerate(lines, 1):
+        try:
+            words = shlex.split(line, comments=True)
+        except ValueError as e:
+            print(f"Line {line_no}: {e}")
+            failures += 1
+            continue
+        if not words:
+            continue
+        name, args = words[0].lower(), words[1:]
+        command = COMMANDS.get(name)
+        if command is None:
+            print(f"Line {line_no}: invalid command '{words[0]}'.")
+            failures += 1
+            continue
+        if len(args) != command.nargs:
+            print(f"Line {line_no}: usage: {command.usage or name}")
+            failures += 1
+            continue
+        if command.stop:
+            break
+        try:
+            ok = command.run_args(sales_list, args) if command.run_args else command.run(sales_list) or True
+        except ValueError as e:
+            print(f"Line {line_no}: {e}")
+            ok = False
+        if not ok:
+            failures += 1
+    if DEDUP.enabled:
+        DEDUP.print_report()
+    save_all_sales(sales_list)
+    print("Saved sales records.")
+    return failures
@@ -0,0 +1,131 @@
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+import g12_1_salesfile as sf
+from g12_1_salesfile import read_sales, is_valid_filename_format, already_imported, add_imported_file, file_digest
+from g12_2_salesmanager import import_all_sales, save_all_sales
+from g12_1_salesdedup import DEDUP
+
+def read_file(file_path: Path) -> dict:
+    """Parse one sales file quietly; runs in a worker process."""
+    try:
+        sales, rejected = read_sales(file_path, verbose=False)
+        return {"file": file_path.name, "sales": sales, "accepted": len(sales), "rejected": rejected}
+    except Exception as e:
+        return {"file": file_path.name, "error": f"{type(e).__name__}: {e}"}
+
+def import_dir(dir_path: Path, workers: int, dedup: bool = False) -> dict:
+    """Import every new sales_qn_yyyy_r.csv in dir_path into all_sales.csv.
+
+    Files are parsed in parallel and merged in name order, all_sales.csv is
+    written once, and only then are the files recorded as imported, so a
+    crash part-way never leaves a file logged but not saved. If all_sales.csv
+    can't be read, nothing is saved over it; if it can't be written, no file
+    is recorded. Either way the files are listed as failed. With `dedup`,
+    sales matching one already held or imported earlier in the run are
+    dropped and counted per file.
+    """
+    start = time.perf_counter()
+    candidates = sorted(path for path in dir_path.glob("sales_q*.csv") if path.is_file())
+    summary = {"dir": str(dir_path), "imported": [], "already_imported": [], "same_content": [],
+               "invalid_name": [], "no_valid_sales": [], "failed": [], "rows_accepted": 0, "rows_rejected": 0}
+    to_read = []
+    for path in candidates:
+        if not is_valid_filename_format(path.name):
+            summary["invalid_name"].append(path.name)
+        elif already_imported(path):
+            summary["already_imported"].append(path.name)
+        else:
+            to_read.append(path)
+
+    # The ledger only knows files from earlier runs, so a renamed copy of a file
+    # in this same run is caught here; only files sharing a size are hashed
+    sizes = Counter(path.stat().st_size for path in to_read)
+    accepted: dict[str, str] = {}  # digest -> file imported in this run
+    unique = []
+    for path in to_read:
+        stat = path.stat()
+        if sizes[stat.st_size] > 1:
+            digest = file_digest(path, stat.st_size, stat.st_mtime_ns)
+            if digest in accepted:
+                summary["same_content"].append({"file": path.name, "same_as": accepted[digest]})
+                continue
+            accepted[digest] = path.name
+        unique.append(path)
+    to_read = unique
+
+    try:
+        sales_list = import_all_sales(strict=True)
+    except Exception as e:
+        error = f"{sf.CONFIG.sales_file.name} could not be read: {type(e).__name__}: {e}"
+        summary["failed"].extend({"file": path.name, "error": error} for path in to_read)
+        summary["elapsed_s"] = round(time.perf_counter() - start, 4)
+        return summary
+
+    if workers > 1 and len(to_read) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(to_read))) as pool:
+            results = list(pool.map(read_file, to_read))
+    else:
+        results = [read_file(path) for path in to_read]
+
+    if dedup:
+        DEDUP.load(sales_list)
+    imported = []
+    for path, result in zip(to_read, results):
+        if "error" in result:
+            summary["failed"].append({"file": result["file"], "error": result["error"]})
+            continue
+        summary["rows_accepted"] += result["accepted"]
+        summary["rows_rejected"] += result["rejected"]
+        if not result["sales"]:
+            summary["no_valid_sales"].append(result["file"])
+            continue
+        new_sales = DEDUP.keep_new(result["sales"], result["file"]) if dedup else result["sales"]
+        sales_list.extend(new_sales)
+        imported.append(path)
+        summary["imported"].append({"file": result["file"], "accepted": result["accepted"],
+                                    "rejected": result["rejected"],
+                                    "duplicates": result["accepted"] - len(new_sales)})
+
+    if imported:
+        if save_all_sales(sales_list):
+            for path in imported:
+                add_imported_file(path)
+        else:
+            error = f"{sf.CONFIG.sales_file.name} could not be saved"
+            summary["failed"].extend({"file": item["file"], "error": error} for item in summary["imported"])
+            summary["imported"] = []
+    if dedup:
+        summary["dedup"] = DEDUP.report()
+    summary["elapsed_s"] = round(time.perf_counter() - start, 4)
+    return summary
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Headless sales data importer.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    import_parser = commands.add_parser("import", help="import every new sales file in a directory")
+    import_parser.add_argument("--dir", type=Path, default=sf.CONFIG.filepath,
+                               help="directory of sales_qn_yyyy_r.csv files (default: the configured files directory)")
+    import_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                               help="parser processes (default: one per CPU)")
+    import_parser.add_argument("--dedup", action="store_true",
+                               help="drop sales with the same date, region and amount as one already held")
+    args = parser.parse_args()
+
+    if not args.dir.is_dir():
+        print(json.dumps({"dir": str(args.dir), "error": "not a directory"}))
+        return 2
+    # stdout carries only the JSON summary; anything the import reports goes to stderr
+    with contextlib.redirect_stdout(sys.stderr):
+        summary = import_dir(args.dir, max(1, args.workers), args.dedup)
+    print(json.dumps(summary, indent=2))
+    return 1 if summary["failed"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
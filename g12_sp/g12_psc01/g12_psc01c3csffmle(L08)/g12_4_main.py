@@ -1,7 +1,39 @@
-from g12_3_console import execute_command
+from g12_3_console import execute_command, run_batch
+from g12_1_salesmetrics import METRICS
+from g12_1_salesdedup import DEDUP
+from pathlib import Path
+import argparse
+import os
+import sys
 
-def main():
-    execute_command()
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Sales data importer. Interactive unless commands are given.")
+    parser.add_argument("commands", nargs="*",
+                        help="commands to run without prompting, each quoted, e.g. \"import sales_q4_2021_w.csv\"")
+    parser.add_argument("--script", type=Path, help="file of commands, one per line ('-' for stdin)")
+    parser.add_argument("--dedup", action="store_true",
+                        help="reject sales with the same date, region and amount as one already held")
+    args = parser.parse_args()
+    DEDUP.enabled = args.dedup
+
+    # SALES_METRICS=<file.json> turns on the timers/counters and writes them there on exit
+    metrics_file = os.environ.get("SALES_METRICS")
+    METRICS.enabled = bool(metrics_file)
+    try:
+        if args.script:
+            try:
+                lines = sys.stdin.readlines() if str(args.script) == "-" else args.script.read_text().splitlines()
+            except OSError as e:
+                print(f"Error reading script: {e}")
+                return 2
+            return 1 if run_batch(lines + args.commands) else 0
+        if args.commands:
+            return 1 if run_batch(args.commands) else 0
+        execute_command()
+        return 0
+    finally:
+        if metrics_file:
+            METRICS.export_json(metrics_file)
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -1,10 +1,184 @@
 import unittest
-from g12_2_salesmanager import raise_exception
+import json
+import os
+import sys
+import tempfile
+from contextlib import redirect_stderr, redirect_stdout
+from decimal import Decimal, ROUND_HALF_UP
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+from g12_2_salesmanager import raise_exception, import_all_sales, save_all_sales
+from g12_3_console import run_batch
+import g12_4_cli
+from g12_4_cli import import_dir
+import g12_1_salesfile as sf
+from g12_1_salesmetrics import METRICS
+from g12_1_salesdedup import DEDUP, DedupIndex
+from g12_1_salesrender import parse_cents, format_cents
 
 class TestSalesManager(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.TemporaryDirectory()
+        self.config = sf.CONFIG
+        sf.CONFIG = sf.SalesConfig(Path(self.data_dir.name), Path(self.data_dir.name) / 'all_sales.csv')
+
+    def tearDown(self):
+        sf.CONFIG = self.config
+        self.data_dir.cleanup()
+
     def test_raise_exception(self):
         with self.assertRaises(OSError):
             raise_exception()
 
+    def test_save_and_reload_keeps_exact_cents(self):
+        sales = [{"amount": cents, "sales_date": "2021-10-15", "region": "w"} for cents in (1, 10, 1376100, 33)]
+        save_all_sales(sales)
+        reloaded = import_all_sales()
+        self.assertEqual([sale["amount"] for sale in reloaded], [1, 10, 1376100, 33])
+        self.assertEqual(sum(sale["amount"] for sale in reloaded), 1376144)
+
+    def test_run_batch(self):
+        (Path(self.data_dir.name) / "sales_q4_2021_w.csv").write_text("13761,2021-10-15,w\n9710,2021-11-15,w\n")
+        failures = run_batch(["import sales_q4_2021_w.csv", "add2 12.5 2021-12-01 e", "# comment", "",
+                              "add1 1 2021 2 30 m", "import sales_q4_2021_w.csv", "bogus", "view"])
+        self.assertEqual(failures, 3)
+        self.assertEqual([sale["amount"] for sale in import_all_sales()], [1376100, 971000, 1250])
+
+    def test_import_dir(self):
+        data_dir = Path(self.data_dir.name)
+        (data_dir / "sales_q4_2021_w.csv").write_text("13761,2021-10-15,w\n9710,2021-11-15\n")
+        (data_dir / "sales_q1_2022_e.csv").write_text("1.5,2022-01-15,e\n")
+        (data_dir / "sales_q1_2022_x.csv").write_text("1.5,2022-01-15,x\n")
+        summary = import_dir(data_dir, workers=1)
+        self.assertEqual([item["file"] for item in summary["imported"]], ["sales_q1_2022_e.csv", "sales_q4_2021_w.csv"])
+        self.assertEqual((summary["rows_accepted"], summary["rows_rejected"]), (2, 1))
+        self.assertEqual(summary["invalid_name"], ["sales_q1_2022_x.csv"])
+        self.assertEqual([sale["amount"] for sale in import_all_sales()], [150, 1376100])
+        self.assertEqual(len(import_dir(data_dir, workers=1)["already_imported"]), 2)
+
+    def test_import_dir_skips_same_content_in_one_run(self):
+        data_dir = Path(self.data_dir.name)
+        (data_dir / "sales_q4_2021_w.csv").write_text("13761,2021-10-15,w\n")
+        (data_dir / "sales_q1_2022_w.csv").write_text("13761,2021-10-15,w\n")
+        (data_dir / "sales_q2_2022_w.csv").write_text("13762,2021-10-15,w\n")
+        summary = import_dir(data_dir, workers=1)
+        self.assertEqual([item["file"] for item in summary["imported"]], ["sales_q1_2022_w.csv", "sales_q2_2022_w.csv"])
+        self.assertEqual(summary["same_content"], [{"file": "sales_q4_2021_w.csv", "same_as": "sales_q1_2022_w.csv"}])
+
+    def test_import_dir_never_saves_over_unreadable_sales(self):
+        data_dir = Path(self.data_dir.name)
+        (data_dir / "sales_q4_2021_w.csv").write_text("13761,2021-10-15,w\n")
+        sf.CONFIG.sales_file.mkdir()  # exists, but can't be read as a file
+        summary = import_dir(data_dir, workers=1)
+        self.assertEqual(summary["imported"], [])
+        self.assertEqual([item["file"] for item in summary["failed"]], ["sales_q4_2021_w.csv"])
+        self.assertTrue(sf.CONFIG.sales_file.is_dir())
+        self.assertFalse(sf.already_imported(data_dir / "sales_q4_2021_w.csv"))
+
+    def test_import_cli_reports_failed_save(self):
+        data_dir = Path(self.data_dir.name)
+        (data_dir / "sales_q4_2021_w.csv").write_text("13761,2021-10-15,w\n")
+        stdout, stderr = StringIO(), StringIO()
+        failing_save = lambda sales_list: print("Error saving sales file: disk full") or False
+        with mock.patch.object(g12_4_cli, "save_all_sales", failing_save), \
+                mock.patch.object(sys, "argv", ["g12_4_cli.py", "import", "--dir", str(data_dir), "--workers", "1"]), \
+                redirect_stdout(stdout), redirect_stderr(stderr):
+            status = g12_4_cli.main()
+        summary = json.loads(stdout.getvalue())
+        self.assertEqual(status, 1)
+        self.assertEqual(summary["imported"], [])
+        self.assertEqual([item["file"] for item in summary["failed"]], ["sales_q4_2021_w.csv"])
+        self.assertIn("disk full", stderr.getvalue())
+        self.assertFalse(sf.already_imported(data_dir / "sales_q4_2021_w.csv"))
+
+    def test_run_batch_dedup(self):
+        save_all_sales([{"amount": 1376100, "sales_date": "2021-10-15", "region": "w"}])
+        (Path(self.data_dir.name) / "sales_q4_2021_w.csv").write_text("13761,2021-10-15,w\n9710,2021-11-15,w\n")
+        DEDUP.enabled = True
+        try:
+            failures = run_batch(["import sales_q4_2021_w.csv", "add2 9710 2021-11-15 w", "add1 9710 2021 11 15 e"])
+        finally:
+            DEDUP.enabled = False
+        self.assertEqual(failures, 1)
+        self.assertEqual(DEDUP.report(), {"checked": 4, "duplicates": 2,
+                                          "by_source": {"sales_q4_2021_w.csv": 1, "add2": 1}})
+        self.assertEqual([sale["amount"] for sale in import_all_sales()], [1376100, 971000, 971000])
+
+    def test_dedup_key_reads_dates_like_the_input_check(self):
+        index = DedupIndex()
+        index.load([{"amount": 971000, "sales_date": "2021-01-05", "region": "w"}])
+        self.assertFalse(index.add({"amount": 971000, "sales_date": "2021-1-5", "region": "w"}, "sales_q1_2021_w.csv"))
+        self.assertTrue(index.add({"amount": 971000, "sales_date": "2021-1-0", "region": "w"}, "sales_q1_2021_w.csv"))
+        self.assertFalse(index.add({"amount": 971000, "sales_date": "2021-1-0", "region": "w"}, "add2"))
+        self.assertEqual(index.report()["by_source"], {"sales_q1_2021_w.csv": 1, "add2": 1})
+
+    def test_ledger_matches_content_not_name(self):
+        data_dir = Path(self.data_dir.name)
+        original = data_dir / "sales_q4_2021_w.csv"
+        original.write_text("13761,2021-10-15,w\n")
+        sf.CONFIG.imported_file.write_text("sales_q1_2021_w.csv\n")  # a name-only line from an older ledger
+        sf.add_imported_file(original)
+
+        renamed = data_dir / "sales_q4_2021_e.csv"
+        renamed.write_bytes(original.read_bytes())
+        corrected = data_dir / "sales_q3_2021_w.csv"
+        corrected.write_text("13762,2021-10-15,w\n")
+        self.assertTrue(sf.already_imported(original))
+        self.assertTrue(sf.already_imported(renamed))
+        self.assertFalse(sf.already_imported(corrected))
+        self.assertTrue(sf.already_imported(data_dir / "sales_q1_2021_w.csv"))
+        # The name-only list keeps the layout the earlier lessons read
+        self.assertEqual(sf.CONFIG.imported_file.read_text().splitlines(), ["sales_q1_2021_w.csv", "sales_q4_2021_w.csv"])
+
+        stat = original.stat()
+        original.write_text("13762,2021-10-15,w\n")
+        os.utime(original, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))  # same size, newer mtime
+        self.assertFalse(sf.already_imported(original))
+
+class TestSalesMetrics(unittest.TestCase):
+    def tearDown(self):
+        METRICS.enabled = False
+        METRICS.reset()
+
+    def test_import_sales_counters(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            file_path = Path(tmp) / "sales_q4_2021_w.csv"
+            file_path.write_text("13761,2021-10-15,w\n9710,2021-11-15\n8-934,2021-12-15,w\n")
+            METRICS.enabled = True
+            sales = sf.import_sales(file_path)
+        report = json.loads(METRICS.to_json())
+        self.assertEqual(len(sales), 1)
+        self.assertEqual(report["counters"]["rows_parsed"], 3)
+        self.assertEqual(report["counters"]["rows_rejected"], 2)
+        self.assertEqual(report["stages"]["import_sales"]["calls"], 1)
+        self.assertEqual(report["stages"]["parse_rows"]["calls"], 1)
+        self.assertNotIn("correct_data_types", report["stages"])
+
+    def test_disabled_by_default(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            file_path = Path(tmp) / "sales_q4_2021_w.csv"
+            file_path.write_text("13761,2021-10-15,w\n")
+            sf.import_sales(file_path)
+        self.assertEqual(METRICS.to_dict(), {"stages": {}, "counters": {}})
+
+class TestSalesRender(unittest.TestCase):
+    def test_matches_decimal_formatting(self):
+        amounts = ["13761", "13761.0", "9710.125", "1.005", "2.675", "0.004999", "12493.995", "1e-7", "1.5e22", " 12345678.9 "]
+        expected = [Decimal(a).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP) for a in amounts]
+        cents = [parse_cents(a) for a in amounts]
+        self.assertEqual(cents, [int(d * 100) for d in expected])
+        self.assertEqual([format_cents(c) for c in cents], [f"{d:,.2f}" for d in expected])
+
+    def test_large_amounts_stay_exact(self):
+        for cents in (9007199254738993, 2 ** 46 * 100 - 1, 2 ** 46 * 100, -2 ** 46 * 100 - 7, 10 ** 20 + 5):
+            self.assertEqual(format_cents(cents), f"{Decimal(cents).scaleb(-2):,.2f}")
+            self.assertEqual(format_cents(cents, grouping=False), f"{Decimal(cents).scaleb(-2):.2f}")
+
+    def test_rejects_non_numbers(self):
+        for text in ("", "8-934", "abc", "inf", "nan"):
+            with self.assertRaises(ValueError):
+                parse_cents(text)
+
 if __name__ == "__main__":
     unittest.main()
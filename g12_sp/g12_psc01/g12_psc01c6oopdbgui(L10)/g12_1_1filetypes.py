@@ -1,4 +1,6 @@
 from pathlib import Path
+from hashlib import blake2b
+import os
 
 class FileType:
     def __init__(self, f_name: str='', d_path: Path = None):
@@ -32,10 +34,49 @@ class SalesFile(FileType):
         return self.filename[self.filename.rfind('.') - 1]
 
 class ImportedFile(FileType):
-    def __init__(self, f_name: str = 'imported_files.txt', d_path: Path = None) -> None:
+    """Imported files, matched on contents through a ledger of
+    'path<TAB>size<TAB>mtime_ns<TAB>blake2b' lines, in the same layout as L08's.
+    A path the ledger has never seen is looked up in the name-only list, which
+    is still written for older readers."""
+
+    def __init__(self, f_name: str = 'imported_files.txt', d_path: Path = None,
+                 ledger_name: str = 'imported_ledger.txt') -> None:
         super().__init__(f_name, d_path)
+        self._ledger_name = ledger_name
+
+    @property
+    def ledger_path(self) -> Path:
+        return self.dirpath / self._ledger_name
+
+    def __ledger(self) -> list[list[str]]:
+        try:
+            with open(self.ledger_path) as file:
+                return [fields for fields in (line.rstrip("\n").rsplit("\t", 3) for line in file)
+                        if len(fields) == 4]
+        except FileNotFoundError:
+            return []
+
+    @staticmethod
+    def __digest(dpath_fname: Path) -> str:
+        digest = blake2b(digest_size=16)
+        with open(dpath_fname, "rb") as file:
+            while chunk := file.read(1 << 20):
+                digest.update(chunk)
+        return digest.hexdigest()
 
     def already_imported(self, dpath_fname: Path) -> bool:
+        # Only files with the size of a ledger entry are hashed, and not even
+        # those when path and mtime match as well
+        entries = self.__ledger()
+        if os.path.exists(dpath_fname):
+            stat = os.stat(dpath_fname)
+            same_size = [entry for entry in entries if entry[1] == str(stat.st_size)]
+            if any(entry[0] == str(dpath_fname) and entry[2] == str(stat.st_mtime_ns) for entry in same_size):
+                return True
+            if same_size and self.__digest(dpath_fname) in {entry[3] for entry in same_size}:
+                return True
+        if any(entry[0] == str(dpath_fname) for entry in entries):
+            return False
         try:
             with open(self.dirpath / self.filename) as file:
                 files = [line.strip() for line in file.readlines()]
@@ -47,6 +88,9 @@ class ImportedFile(FileType):
         try:
             with open(self.dirpath / self.filename, "a") as file:
                 file.write(f"{dpath_fname}\n")
+            stat = os.stat(dpath_fname)
+            with open(self.ledger_path, "a") as file:
+                file.write(f"{dpath_fname}\t{stat.st_size}\t{stat.st_mtime_ns}\t{self.__digest(dpath_fname)}\n")
         except Exception as e:
             print(f"{type(e)} - The imported file could not be documented.")
 
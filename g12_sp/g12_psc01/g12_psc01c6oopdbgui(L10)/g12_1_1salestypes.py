@@ -1,6 +1,7 @@
 from typing import Optional, Self, Iterator, Union
 from datetime import date
 from dataclasses import dataclass
+from decimal import Decimal, ROUND_HALF_UP
 
 
 @dataclass
@@ -55,10 +56,13 @@ class Regions:
 
 
 class Sales:
+    """One sale. The amount is held in whole cents (an int) so sums are exact;
+    to_cents() and format_cents() convert at the edges."""
     DATE_FORMAT = "%Y-%m-%d"
     MIN_YEAR, MAX_YEAR = 2000, 2999
+    CENT = Decimal('0.01')
 
-    def __init__(self, amount: float = 0.0, sales_date: date = None, region: Region = None, id: int = 0) -> None:
+    def __init__(self, amount: int = 0, sales_date: date = None, region: Region = None, id: int = 0) -> None:
         self._salesdata = {
             "ID": id,
             "amount": amount,
@@ -70,12 +74,27 @@ class Sales:
         return (f"Sales(ID={self._salesdata['ID']}, amount={self._salesdata['amount']}, "
                 f"date={self._salesdata['sales_date']}, region={self._salesdata['region'].code if self._salesdata['region'] else None})")
 
-    def __getitem__(self, key: str) -> Union[float, date, Region, int]:
+    def __getitem__(self, key: str) -> Union[date, Region, int]:
         return self._salesdata[key]
 
-    def __setitem__(self, key: str, value: Union[float, date, Region, int]) -> None:
+    def __setitem__(self, key: str, value: Union[date, Region, int]) -> None:
         self._salesdata[key] = value
 
+    @staticmethod
+    def to_cents(amount: Union[str, float, int]) -> int:
+        """Whole cents, rounded half up, for typed text or a stored REAL amount.
+        Raises ValueError if it isn't a finite number."""
+        try:
+            return int(Decimal(str(amount).strip()).quantize(Sales.CENT, rounding=ROUND_HALF_UP).scaleb(2))
+        except ArithmeticError:  # decimal.InvalidOperation
+            raise ValueError(f"{amount!r} is not a valid amount") from None
+
+    @staticmethod
+    def format_cents(cents: int, grouping: bool = True) -> str:
+        """'1,234.56' for 123456, or '1234.56' without grouping."""
+        whole, frac = divmod(abs(cents), 100)
+        return f"{'-' if cents < 0 else ''}{whole:{',' if grouping else ''}}.{frac:02d}"
+
     @property
     def has_bad_amount(self) -> bool:
         return self._salesdata["amount"] == "?" or self._salesdata["amount"] <= 0
@@ -1,26 +1,396 @@
 
-from g12_1_1filetypes import FileType
+from g12_1_1filetypes import FileType, SalesFile
 from g12_1_1salestypes import Sales, Regions, Region
-from typing import Optional
+from typing import Optional, Iterator, Union
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from functools import wraps
 from pathlib import Path
-from datetime import date
+from datetime import date, timedelta
+import argparse
+import csv
+import os
 import sqlite3
+import time
+
+# salesDate is stored as 'yyyy-mm-dd' text
+YEAR_OF = "CAST(substr({0}, 1, 4) AS INTEGER)"
+QUARTER_OF = "((CAST(substr({0}, 6, 2) AS INTEGER) + 2) / 3)"
+SALES_YEAR = YEAR_OF.format("salesDate")
+SALES_QUARTER = QUARTER_OF.format("salesDate")
+REPORT_COLUMNS = {"region": "region", "year": SALES_YEAR, "quarter": SALES_QUARTER}
+ORDINAL_OF = "CAST(julianday({0}) - 1721424.5 AS INTEGER)"  # same value as date.toordinal()
+CENTS_OF = "CAST(round({0} * 100) AS INTEGER)"
+
+# Schema versions, kept in PRAGMA user_version:
+#   0  the original tables
+#   1  Sales.salesOrdinal, the day ordinal of salesDate, kept in step by triggers
+#   2  Sales.amountCents, the amount in whole cents; amount stays as amountCents / 100.0
+#      and is filled in by triggers for writers that only set amount
+SCHEMA_VERSION = 2
+MIGRATIONS = {
+    1: f"""
+    ALTER TABLE Sales ADD COLUMN salesOrdinal INTEGER;
+    UPDATE Sales SET salesOrdinal = {ORDINAL_OF.format("salesDate")};
+    CREATE INDEX IF NOT EXISTS idx_sales_ordinal ON Sales (salesOrdinal);
+    CREATE INDEX IF NOT EXISTS idx_sales_region_ordinal ON Sales (region, salesOrdinal);
+    CREATE TRIGGER IF NOT EXISTS trg_sales_ordinal_insert AFTER INSERT ON Sales BEGIN
+        UPDATE Sales SET salesOrdinal = {ORDINAL_OF.format("NEW.salesDate")} WHERE ID = NEW.ID;
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_sales_ordinal_update AFTER UPDATE OF salesDate ON Sales BEGIN
+        UPDATE Sales SET salesOrdinal = {ORDINAL_OF.format("NEW.salesDate")} WHERE ID = NEW.ID;
+    END;
+    """,
+    2: f"""
+    ALTER TABLE Sales ADD COLUMN amountCents INTEGER;
+    UPDATE Sales SET amountCents = {CENTS_OF.format("amount")};
+    CREATE TRIGGER IF NOT EXISTS trg_sales_cents_insert AFTER INSERT ON Sales WHEN NEW.amountCents IS NULL BEGIN
+        UPDATE Sales SET amountCents = {CENTS_OF.format("NEW.amount")} WHERE ID = NEW.ID;
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_sales_cents_update AFTER UPDATE OF amount ON Sales
+    WHEN NEW.amountCents IS OLD.amountCents BEGIN
+        UPDATE Sales SET amountCents = {CENTS_OF.format("NEW.amount")} WHERE ID = NEW.ID;
+    END;
+    """,
+}
+
+SUMMARY_TABLE = """
+CREATE TABLE IF NOT EXISTS SalesSummary (
+    region TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    quarter INTEGER NOT NULL,
+    totalCents INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (region, year, quarter)
+) WITHOUT ROWID;
+"""
+
+def summary_triggers(schema_version: int) -> str:
+    """(Re)create the triggers on Sales that keep SalesSummary current. From
+    version 2 they add up amountCents, falling back to the cents of amount for
+    a row whose amountCents the cents triggers have yet to fill in."""
+    if schema_version >= 2:
+        new_cents, old_cents = (f"COALESCE({row}.amountCents, {CENTS_OF.format(row + '.amount')})"
+                                for row in ("NEW", "OLD"))
+        columns = "amount, amountCents, salesDate, region"
+    else:
+        new_cents, old_cents = CENTS_OF.format("NEW.amount"), CENTS_OF.format("OLD.amount")
+        columns = "amount, salesDate, region"
+    add_new = f"""INSERT INTO SalesSummary (region, year, quarter, totalCents, count)
+    VALUES (NEW.region, {YEAR_OF.format("NEW.salesDate")}, {QUARTER_OF.format("NEW.salesDate")}, {new_cents}, 1)
+    ON CONFLICT (region, year, quarter) DO UPDATE SET totalCents = totalCents + excluded.totalCents, count = count + 1;"""
+    remove_old = f"""UPDATE SalesSummary SET totalCents = totalCents - {old_cents}, count = count - 1
+    WHERE region = OLD.region AND year = {YEAR_OF.format("OLD.salesDate")} AND quarter = {QUARTER_OF.format("OLD.salesDate")};"""
+    return f"""
+DROP TRIGGER IF EXISTS trg_sales_summary_insert;
+DROP TRIGGER IF EXISTS trg_sales_summary_delete;
+DROP TRIGGER IF EXISTS trg_sales_summary_update;
+
+CREATE TRIGGER trg_sales_summary_insert AFTER INSERT ON Sales BEGIN
+    {add_new}
+END;
+
+CREATE TRIGGER trg_sales_summary_delete AFTER DELETE ON Sales BEGIN
+    {remove_old}
+    DELETE FROM SalesSummary WHERE count = 0;
+END;
+
+CREATE TRIGGER trg_sales_summary_update AFTER UPDATE OF {columns} ON Sales BEGIN
+    {remove_old}
+    {add_new}
+    DELETE FROM SalesSummary WHERE count = 0;
+END;
+"""
+
+CHECKPOINT_MODES = ("PASSIVE", "FULL", "RESTART", "TRUNCATE")
+
+def retry_when_locked(attempts: int = 5, base_delay: float = 0.05):
+    """Retry a write that failed because another connection held the lock,
+    doubling the wait each time. busy_timeout already waits inside SQLite;
+    this covers the cases where SQLite gives up at once, such as a
+    deferred transaction that can't be upgraded to a write. The error is
+    reported once, when it is not a lock error or the last attempt fails."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            for attempt in range(attempts):
+                try:
+                    return func(*args, **kwargs)
+                except sqlite3.Error as e:
+                    locked = isinstance(e, sqlite3.OperationalError) and \
+                        any(word in str(e) for word in ("locked", "busy"))
+                    if attempt == attempts - 1 or not locked:
+                        print(f"Database error: {e}")
+                        raise
+                    time.sleep(base_delay * 2 ** attempt)
+        return wrapper
+    return decorator
 
 class SQLiteDBAccess:
-    def __init__(self, db_name: str = '', db_path: Path = None):
+    def __init__(self, db_name: str = '', db_path: Path = None, read_only: bool = False,
+                 wal: bool = False, busy_timeout_ms: int = 5000, checkpoint_every: int = 1000,
+                 migrate: bool = False):
         self._valid_regions = Regions.from_dict()
+        self._region_by_code: dict[str, Region] = {region.code: region for region in self._valid_regions}
         fname: str = db_name if db_name else 'sales_db.sqlite'
         fpath: Path = db_path if db_path else Path(__file__).parent.parent.parent / 'psc01_db'
         self._sqlite_sales_db = FileType(fname, fpath)
+        self._schema_version: Optional[int] = None
+        self._has_summary = False
+        self._read_only = read_only
+        self._migrate_pending = migrate and not read_only  # only when asked: brought up to SCHEMA_VERSION on first connect
+        self._wal = wal and not read_only  # switching journal mode is a write
+        self._wal_ready = False
+        self._busy_timeout = busy_timeout_ms / 1000
+        self._checkpoint_every = checkpoint_every
+        self._writes_since_checkpoint = 0
+
+    @property
+    def read_only(self) -> bool:
+        return self._read_only
 
     def __connect(self) -> sqlite3.Connection:
+        db_file = self._sqlite_sales_db.dirpath / self._sqlite_sales_db.filename
         try:
-            conn = sqlite3.connect(self._sqlite_sales_db.dirpath / self._sqlite_sales_db.filename)
+            if self._read_only:
+                conn = sqlite3.connect(f"{db_file.resolve().as_uri()}?mode=ro", uri=True, timeout=self._busy_timeout)
+            else:
+                conn = sqlite3.connect(db_file, timeout=self._busy_timeout)
+            if self._wal:
+                if not self._wal_ready:
+                    # journal_mode is stored in the file, so this only has to happen once
+                    conn.execute("PRAGMA journal_mode = WAL")
+                    self._wal_ready = True
+                conn.execute("PRAGMA synchronous = NORMAL")  # durable at checkpoints, safe in WAL mode
             conn.row_factory = sqlite3.Row
-            return conn
         except sqlite3.Error as e:
             print(f"Database connection error: {e}")
             raise
+        if self._migrate_pending:
+            self._migrate_pending = False
+            try:
+                self.__migrate(conn, SCHEMA_VERSION)
+            except sqlite3.Error:
+                pass  # already reported; every query still works on the older schema
+        return conn
+
+    def checkpoint(self, mode: str = "PASSIVE") -> Optional[tuple[int, int, int]]:
+        """Copy WAL frames back into the database file. PASSIVE never waits for
+        readers; TRUNCATE also empties the -wal file. Returns SQLite's
+        (busy, wal frames, checkpointed frames), or None outside WAL mode."""
+        if mode not in CHECKPOINT_MODES:
+            raise ValueError(f"Checkpoint mode must be one of {', '.join(CHECKPOINT_MODES)}")
+        try:
+            with closing(self.__connect()) as conn:
+                row = conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+                self._writes_since_checkpoint = 0
+                return tuple(row) if row[1] != -1 else None
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+        return None
+
+    def __wrote(self, rows: int) -> None:
+        # A PASSIVE checkpoint every so many writes keeps the WAL short without
+        # waiting on whoever is still reading
+        self._writes_since_checkpoint += rows
+        if self._wal and self._writes_since_checkpoint >= self._checkpoint_every:
+            self.checkpoint("PASSIVE")
+
+    @property
+    def schema_version(self) -> int:
+        if self._schema_version is None:
+            try:
+                with closing(self.__connect()) as conn:
+                    self._schema_version = conn.execute("PRAGMA user_version").fetchone()[0]
+            except sqlite3.Error as e:
+                print(f"Database error: {e}")
+                return 0
+        return self._schema_version
+
+    def migrate_schema(self, target: int = SCHEMA_VERSION) -> int:
+        """Apply the migrations between the current schema version and `target`,
+        each in its own transaction. Returns the version reached. Opening with
+        migrate=True does the same on first connect; otherwise the schema is left
+        as found and every query works with the version it finds."""
+        with closing(self.__connect()) as conn:
+            self.__migrate(conn, target)
+        return self.schema_version
+
+    def __migrate(self, conn: sqlite3.Connection, target: int) -> None:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        self._schema_version = version
+        for step in range(version + 1, target + 1):
+            try:
+                conn.executescript(f"BEGIN; {MIGRATIONS[step]} PRAGMA user_version = {step}; COMMIT;")
+            except sqlite3.Error as e:
+                conn.rollback()
+                print(f"Database error: migration to version {step} failed: {e}")
+                raise
+            self._schema_version = step
+        if version < 2 <= target and conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'SalesSummary'").fetchone():
+            self.__refresh_summary_triggers(conn)
+
+    def __cents_column(self) -> str:
+        return "amountCents" if self.schema_version >= 2 else CENTS_OF.format("amount")
+
+    def __date_range(self, start: Optional[date], end: Optional[date]) -> tuple[list[str], list]:
+        # Integer comparisons on the ordinal column once it exists, text comparisons before
+        column = "salesOrdinal" if self.schema_version >= 1 else "salesDate"
+        where, params = [], []
+        for op, day in ((">=", start), ("<=", end)):
+            if day is not None:
+                where.append(f"{column} {op} ?")
+                params.append(day.toordinal() if self.schema_version >= 1 else day.isoformat())
+        return where, params
+
+    def ensure_lookup_index(self) -> None:
+        """Index Sales on (salesDate, region) so date/region lookups don't scan the table."""
+        try:
+            with self.__connect() as conn:
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_sales_date_region ON Sales (salesDate, region)")
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+
+    def ensure_report_index(self) -> None:
+        """Covering indexes for sales_totals(), one led by region and one by period.
+        The grouping expressions are indexed exactly as the query spells them, with
+        the amount column alongside (amountCents from version 2), so reports are
+        read from an index in group order. An index left from the other schema
+        version is replaced."""
+        amount = "amountCents" if self.schema_version >= 2 else "amount"
+        indexes = {"idx_sales_report": f"region, {SALES_YEAR}, {SALES_QUARTER}, {amount}",
+                   "idx_sales_period": f"{SALES_YEAR}, {SALES_QUARTER}, region, {amount}"}
+        try:
+            with self.__connect() as conn:
+                for name, columns in indexes.items():
+                    sql = f"CREATE INDEX {name} ON Sales ({columns})"
+                    row = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'index' AND name = ?",
+                                       (name,)).fetchone()
+                    if row is None or row[0] != sql:
+                        conn.execute(f"DROP INDEX IF EXISTS {name}")
+                        conn.execute(sql)
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+
+    def sales_totals(self, group_by: tuple = ("region",), year: int = None, region_code: str = None) -> list[dict]:
+        """SUM and COUNT of amounts computed in SQLite, grouped by any of 'region',
+        'year' and 'quarter'. Each result is a dict with the group keys plus
+        'total_cents' and 'count'. Amounts are summed as whole cents, so totals are exact."""
+        unknown = set(group_by) - REPORT_COLUMNS.keys()
+        if unknown:
+            raise ValueError(f"Cannot group sales by {', '.join(sorted(unknown))}")
+        keys = [f"{REPORT_COLUMNS[name]} AS {name}" for name in group_by]
+        where, params = [], []
+        if year is not None:
+            where.append(f"{SALES_YEAR} = ?")
+            params.append(year)
+        if region_code is not None:
+            where.append("region = ?")
+            params.append(region_code)
+
+        # The report indexes carry the same amount column, so they still cover the query
+        totals = [f"SUM({self.__cents_column()}) AS total_cents", "COUNT(*) AS count"]
+        sql = f"SELECT {', '.join(keys + totals)} FROM Sales"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        if group_by:
+            order = ", ".join(REPORT_COLUMNS[name] for name in group_by)
+            sql += f" GROUP BY {order} ORDER BY {order}"
+        try:
+            with self.__connect() as conn:
+                return [dict(row) for row in conn.execute(sql, params)]
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+        return []
+
+    def ensure_sales_summary(self) -> None:
+        """Create the SalesSummary table and the triggers on Sales that keep it
+        current. A newly created table is filled from Sales straight away."""
+        try:
+            with self.__connect() as conn:
+                columns = [row['name'] for row in conn.execute("PRAGMA table_info(SalesSummary)")]
+                exists = 'totalCents' in columns
+                if columns and not exists:
+                    # Earlier layout with a REAL total; it only holds derived data, so start over
+                    conn.executescript("DROP TRIGGER IF EXISTS trg_sales_summary_insert;"
+                                       "DROP TRIGGER IF EXISTS trg_sales_summary_delete;"
+                                       "DROP TRIGGER IF EXISTS trg_sales_summary_update;"
+                                       "DROP TABLE SalesSummary;")
+                conn.executescript(SUMMARY_TABLE)
+                self.__refresh_summary_triggers(conn)
+            if not exists:
+                self.rebuild_sales_summary()
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+
+    def __refresh_summary_triggers(self, conn: sqlite3.Connection) -> None:
+        # The triggers read amountCents from version 2, so they are replaced
+        # whenever they were written for the other side of that line
+        row = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'trigger' "
+                           "AND name = 'trg_sales_summary_update'").fetchone()
+        if row is None or ("amountCents" in row[0]) != (self.schema_version >= 2):
+            conn.executescript(summary_triggers(self.schema_version))
+
+    def rebuild_sales_summary(self) -> int:
+        """Recompute SalesSummary from Sales, e.g. after the triggers were dropped
+        or Sales was changed with them disabled. Returns the number of groups."""
+        try:
+            with self.__connect() as conn:
+                conn.execute("DELETE FROM SalesSummary")
+                cursor = conn.execute(
+                    "INSERT INTO SalesSummary (region, year, quarter, totalCents, count) "
+                    f"SELECT region, {SALES_YEAR}, {SALES_QUARTER}, SUM({self.__cents_column()}), COUNT(*) "
+                    "FROM Sales "
+                    f"GROUP BY region, {SALES_YEAR}, {SALES_QUARTER}")
+                conn.commit()
+                return cursor.rowcount
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+            raise
+
+    def __summary_source(self, conn: sqlite3.Connection) -> str:
+        # A database nobody has run ensure_sales_summary() on, such as one only ever
+        # opened read-only, is summarised from Sales on the fly with the same columns
+        if not self._has_summary:
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(SalesSummary)")]
+            self._has_summary = 'totalCents' in columns
+        if self._has_summary:
+            return "SalesSummary"
+        return (f"(SELECT region, {SALES_YEAR} AS year, {SALES_QUARTER} AS quarter, "
+                f"SUM({self.__cents_column()}) AS totalCents, COUNT(*) AS count FROM Sales "
+                f"GROUP BY region, {SALES_YEAR}, {SALES_QUARTER})")
+
+    def retrieve_sales_summary(self, region_code: str, year: int, quarter: int) -> Optional[dict]:
+        try:
+            with self.__connect() as conn:
+                row = conn.execute(
+                    f"SELECT * FROM {self.__summary_source(conn)} WHERE region = ? AND year = ? AND quarter = ?",
+                    (region_code, year, quarter)).fetchone()
+                return dict(row) if row else None
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+        return None
+
+    def retrieve_sales_summaries(self, year: int = None, region_code: str = None) -> list[dict]:
+        where, params = [], []
+        if year is not None:
+            where.append("year = ?")
+            params.append(year)
+        if region_code is not None:
+            where.append("region = ?")
+            params.append(region_code)
+        try:
+            with self.__connect() as conn:
+                sql = f"SELECT * FROM {self.__summary_source(conn)}"
+                if where:
+                    sql += " WHERE " + " AND ".join(where)
+                return [dict(row) for row in conn.execute(sql + " ORDER BY year, quarter, region", params)]
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+        return []
 
     def retrieve_sales_by_date_region(self, sales_date: date, region_code: str) -> Optional[Sales]:
         try:
@@ -32,29 +402,179 @@ class SQLiteDBAccess:
                 )
                 row = cursor.fetchone()
                 if row:
-                    region = self._valid_regions.get_region_by_code(row['region'])
-                    return Sales(
-                        amount=row['amount'],
-                        sales_date=date.fromisoformat(row['salesDate']),
-                        region=region,
-                        id=row['ID'])
+                    return self.__to_sales(row)
                 else:
                     return None
         except sqlite3.Error as e:
             print(f"Database error: {e}")
         return None
 
-    def update_sales(self, sales: Sales) -> None:
+    def retrieve_sales_page(self, after_id: int = 0, limit: int = 100, before_id: int = None) -> list[Sales]:
+        """Keyset pagination on ID: the `limit` rows after `after_id`, or, when
+        `before_id` is given, the `limit` rows just before it. Rows come back in ID order."""
         try:
             with self.__connect() as conn:
                 cursor = conn.cursor()
-                cursor.execute(
-                    "UPDATE Sales SET amount = ? WHERE ID = ?",
-                    (sales['amount'], sales['ID']))
-                conn.commit()
+                if before_id is None:
+                    cursor.execute("SELECT * FROM Sales WHERE ID > ? ORDER BY ID LIMIT ?", (after_id, limit))
+                    rows = cursor.fetchall()
+                else:
+                    cursor.execute("SELECT * FROM Sales WHERE ID < ? ORDER BY ID DESC LIMIT ?", (before_id, limit))
+                    rows = cursor.fetchall()[::-1]
+                return [self.__to_sales(row) for row in rows]
+        except sqlite3.Error as e:
+            print(f"Database error: {e}")
+        return []
+
+    def iter_sales(self, region_code: str = None, start: date = None, end: date = None,
+                   batch_size: int = 500, columnar: bool = False) -> Iterator[Union[Sales, dict]]:
+        """Stream Sales rows in ID order, optionally filtered by region and an
+        inclusive date range, fetching `batch_size` rows at a time.
+
+        With columnar=True each batch is yielded as one dict of column lists
+        (ID, amountCents, salesDate, region) holding the stored values undecoded,
+        instead of one Sales per row."""
+        where, params = self.__date_range(start, end)
+        if region_code is not None:
+            where.append("region = ?")
+            params.append(region_code)
+        sql = f"SELECT ID, {self.__cents_column()} AS amountCents, salesDate, region FROM Sales"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+
+        with closing(self.__connect()) as conn:
+            if columnar:
+                conn.row_factory = None
+            cursor = conn.execute(sql + " ORDER BY ID", params)
+            while rows := cursor.fetchmany(batch_size):
+                if columnar:
+                    yield dict(zip(("ID", "amountCents", "salesDate", "region"), map(list, zip(*rows))))
+                else:
+                    yield from map(self.__to_sales, rows)
+
+    def retrieve_sales_between(self, start: date, end: date, region_code: str = None,
+                               decode: bool = True) -> list[Union[Sales, tuple]]:
+        """Sales dated from `start` to `end` inclusive, optionally for one region, in date order.
+        Either bound may be None to leave that end of the range open.
+
+        With decode=False the rows come back as (ID, cents, day ordinal, region)
+        tuples, leaving date.fromordinal() to whoever displays them."""
+        where, params = self.__date_range(start, end)
+        if region_code is not None:
+            where.append("region = ?")
+            params.append(region_code)
+        ordinal = "salesOrdinal" if self.schema_version >= 1 else ORDINAL_OF.format("salesDate")
+        columns = "*" if decode else f"ID, {self.__cents_column()}, {ordinal}, region"
+        sql = f"SELECT {columns} FROM Sales"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        try:
+            with closing(self.__connect()) as conn:
+                if not decode:
+                    conn.row_factory = None
+                cursor = conn.execute(f"{sql} ORDER BY {ordinal}, ID", params)
+                rows = cursor.fetchall()
+                return [self.__to_sales(row) for row in rows] if decode else rows
         except sqlite3.Error as e:
             print(f"Database error: {e}")
+        return []
+
+    def export_partitions(self, out_dir: Path, workers: int = 4, batch_size: int = 1000) -> list[tuple[Path, int]]:
+        """Write one sales_qN_yyyy_r.csv per (year, quarter, region) present in
+        Sales, in the amount,date layout of the quarterly files. Partitions are
+        exported in parallel, each streamed through its own connection.
+        Returns (file, rows written) pairs."""
+        out_dir.mkdir(parents=True, exist_ok=True)
+        partitions = []
+        for group in self.sales_totals(("year", "quarter", "region")):
+            name = f"sales_q{group['quarter']}_{group['year']}_{group['region']}.csv"
+            if SalesFile(name, out_dir).is_valid_filename_format:
+                partitions.append((group['year'], group['quarter'], group['region'], out_dir / name))
+            else:
+                print(f"Skipping {group['count']} sales that would go to {name}: not a valid sales file name.")
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(lambda partition: self.__export_partition(*partition, batch_size), partitions))
+
+    def __export_partition(self, year: int, quarter: int, region_code: str, file_path: Path,
+                           batch_size: int) -> tuple[Path, int]:
+        if self.schema_version >= 1:
+            start = date(year, 3 * quarter - 2, 1)
+            end = (date(year + 1, 1, 1) if quarter == 4 else date(year, 3 * quarter + 1, 1)) - timedelta(days=1)
+            where, params = self.__date_range(start, end)
+        else:
+            # Matches the report index's expressions, so the partition is still an index range
+            where, params = [f"{SALES_YEAR} = ?", f"{SALES_QUARTER} = ?"], [year, quarter]
+        rows = 0
+        tmp_path = file_path.with_name(file_path.name + ".tmp")
+        with closing(self.__connect()) as conn, open(tmp_path, "w", newline="") as file:
+            conn.row_factory = None
+            writer = csv.writer(file)
+            cursor = conn.execute(
+                f"SELECT {self.__cents_column()}, salesDate FROM Sales WHERE region = ? AND {' AND '.join(where)} "
+                "ORDER BY salesDate, ID", [region_code, *params])
+            while batch := cursor.fetchmany(batch_size):
+                writer.writerows((Sales.format_cents(cents, grouping=False), day) for cents, day in batch)
+                rows += len(batch)
+        os.replace(tmp_path, file_path)  # readers never see a half-written file
+        return file_path, rows
+
+    def __to_sales(self, row: sqlite3.Row) -> Sales:
+        # iter_sales selects cents as amountCents on every schema version; SELECT * has it from v2
+        return Sales(
+            amount=row['amountCents'] if 'amountCents' in row.keys() else Sales.to_cents(row['amount']),
+            sales_date=date.fromisoformat(row['salesDate']),
+            region=self._region_by_code.get(row['region']),
+            id=row['ID'])
+
+    @retry_when_locked()
+    def update_sales(self, sales: Sales) -> None:
+        with closing(self.__connect()) as conn:
+            cursor = conn.cursor()
+            cursor.execute(self.__update_sql(), self.__update_params(sales))
+            conn.commit()
+        self.__wrote(1)
+
+    def __update_sql(self) -> str:
+        if self.schema_version >= 2:
+            return "UPDATE Sales SET amount = ?, amountCents = ? WHERE ID = ?"
+        return "UPDATE Sales SET amount = ? WHERE ID = ?"
+
+    def __update_params(self, sales: Sales) -> tuple:
+        # The REAL column keeps the nearest double to the cents, so older readers still work
+        if self.schema_version >= 2:
+            return sales['amount'] / 100, sales['amount'], sales['ID']
+        return sales['amount'] / 100, sales['ID']
+
+    @retry_when_locked()
+    def update_sales_many(self, changes: list[tuple[Sales, int]]) -> list[int]:
+        """Write a batch of edits in one transaction. Each change is a Sales with its
+        new amount plus the amount (in cents) it had when it was loaded. If any of those rows
+        has changed in the database since, nothing is written and their IDs are returned."""
+        if not changes:
+            return []
+        conn = self.__connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")  # hold the write lock between the check and the updates
+            ids = [sales['ID'] for sales, _ in changes]
+            current = {}
+            for i in range(0, len(ids), 500):  # stay under SQLite's bound-parameter limit
+                chunk = ids[i:i + 500]
+                cursor = conn.execute(
+                    f"SELECT ID, {self.__cents_column()} FROM Sales WHERE ID IN ({','.join('?' * len(chunk))})", chunk)
+                current.update((row[0], row[1]) for row in cursor)
+            conflicts = [sales['ID'] for sales, original in changes if current.get(sales['ID']) != original]
+            if conflicts:
+                conn.rollback()
+                return conflicts
+            conn.executemany(self.__update_sql(), [self.__update_params(sales) for sales, _ in changes])
+            conn.commit()
+            self.__wrote(len(changes))
+            return []
+        except sqlite3.Error:
+            conn.rollback()  # retry_when_locked reports the error
             raise
+        finally:
+            conn.close()
 
     def retrieve_regions(self) -> Optional[Regions]:
         try:
@@ -71,4 +591,39 @@ class SQLiteDBAccess:
         return None
 
 def main():
-    pass
+    parser = argparse.ArgumentParser(description="Maintain and query the sales database.")
+    parser.add_argument("--db", type=Path, help="path to the SQLite file (default: psc01_db/sales_db.sqlite)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("migrate", help=f"upgrade the schema to version {SCHEMA_VERSION}")
+    commands.add_parser("rebuild-summary", help="recompute SalesSummary from Sales")
+    export = commands.add_parser("export", help="write Sales out as sales_qN_yyyy_r.csv files")
+    export.add_argument("--out", type=Path, required=True, help="directory for the exported files")
+    export.add_argument("--workers", type=int, default=4)
+    summary = commands.add_parser("summary", help="show totals by year, quarter and region")
+    summary.add_argument("--year", type=int)
+    summary.add_argument("--region")
+    args = parser.parse_args()
+
+    # Only "migrate" changes the schema version; the other commands work with the one they find
+    db = SQLiteDBAccess(args.db.name, args.db.parent) if args.db else SQLiteDBAccess()
+    if args.command == "migrate":
+        print(f"Schema version {db.schema_version} -> {db.migrate_schema()}.")
+    db.ensure_report_index()  # after migrating, so the indexes match the new version
+    db.ensure_sales_summary()
+    if args.command == "rebuild-summary":
+        print(f"SalesSummary rebuilt: {db.rebuild_sales_summary()} groups.")
+    elif args.command == "export":
+        exported = db.export_partitions(args.out, args.workers)
+        for file_path, rows in exported:
+            print(f"{file_path.name}: {rows} rows")
+        print(f"Exported {sum(rows for _, rows in exported)} rows to {len(exported)} files.")
+    elif args.command == "summary":
+        regions = Regions.from_dict()
+        print(f"{'Year':<6}{'Qtr':<5}{'Region':<10}{'Count':>8}{'Total':>18}")
+        for row in db.retrieve_sales_summaries(args.year, args.region):
+            region = regions.get_region_by_code(row['region'])
+            print(f"{row['year']:<6}{row['quarter']:<5}{region.name if region else row['region']:<10}"
+                  f"{row['count']:>8,}{Sales.format_cents(row['totalCents']):>18}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+from g12_1_1filetypes import FileType
+from g12_1_1salestypes import Sales
+from dataclasses import dataclass
+from contextlib import closing
+from datetime import date
+from hashlib import blake2b
+from pathlib import Path
+import argparse
+import csv
+import os
+import sqlite3
+
+SYNC_SCHEMA = """
+CREATE TABLE IF NOT EXISTS SalesSync (
+    rowHash TEXT NOT NULL,
+    occurrence INTEGER NOT NULL,
+    salesID INTEGER NOT NULL,
+    PRIMARY KEY (rowHash, occurrence)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS SyncState (
+    source TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtimeNs INTEGER NOT NULL,
+    prefixHash TEXT NOT NULL
+);
+"""
+HEADER = ["amount", "sales_date", "region"]  # optional first line of all_sales.csv
+HASH_CHUNK = 1 << 20
+
+
+@dataclass
+class SyncResult:
+    mode: str = "unchanged"  # unchanged, append or full
+    inserted: int = 0
+    deleted: int = 0
+    rejected: int = 0
+
+
+class HashedLines:
+    """The lines of a binary file as text for csv.reader, read a buffer at a
+    time. Every byte read is fed to `digest`; `terminated` says whether the
+    last line ended with a newline."""
+
+    def __init__(self, file, digest) -> None:
+        self._file = file
+        self._digest = digest
+        self.terminated = False
+
+    def __iter__(self):
+        for line in self._file:
+            self._digest.update(line)
+            self.terminated = line.endswith(b"\n")
+            yield line.decode()
+
+
+class SalesSync:
+    """One-way sync of all_sales.csv into the Sales table.
+
+    Every CSV line is keyed by a hash of its fields plus its occurrence
+    number among identical lines, and SalesSync maps those keys to the Sales
+    rows they created. SyncState keeps a high-water mark for the file: its
+    size, mtime and a hash of its contents. An untouched file is skipped
+    without being read; a file that only grew has just its new tail parsed;
+    anything else gets a full diff. Inserts and deletes are applied in one
+    transaction. Sales rows that did not come from the CSV are never touched.
+    """
+
+    def __init__(self, csv_file: FileType = None, db_file: FileType = None) -> None:
+        self._csv_file = csv_file if csv_file else FileType('all_sales.csv')
+        self._db_file = db_file if db_file else FileType(
+            'sales_db.sqlite', Path(__file__).parent.parent.parent / 'psc01_db')
+
+    @property
+    def csv_path(self) -> Path:
+        return self._csv_file.dirpath / self._csv_file.filename
+
+    def __connect(self) -> sqlite3.Connection:
+        try:
+            conn = sqlite3.connect(self._db_file.dirpath / self._db_file.filename)
+            conn.executescript(SYNC_SCHEMA)
+            return conn
+        except sqlite3.Error as e:
+            print(f"Database connection error: {e}")
+            raise
+
+    @staticmethod
+    def row_hash(row: list[str]) -> str:
+        return blake2b(",".join(field.strip() for field in row).encode(), digest_size=16).hexdigest()
+
+    @staticmethod
+    def parse_row(row: list[str], region_codes: set[str]):
+        """(amount, salesDate, region) ready for the Sales table, or None for a bad row.
+        The amount is rounded to whole cents; the database fills amountCents from it."""
+        if len(row) != 3:
+            return None
+        try:
+            cents = Sales.to_cents(row[0])
+            sales_date = date.fromisoformat(row[1].strip())
+        except ValueError:
+            return None
+        region = row[2].strip()
+        if cents <= 0 or region not in region_codes or \
+                not (Sales.MIN_YEAR <= sales_date.year <= Sales.MAX_YEAR):
+            return None
+        return cents / 100, sales_date.isoformat(), region
+
+    def sync(self, full: bool = False) -> SyncResult:
+        """Bring the Sales table in line with the CSV. `full` forces a full diff."""
+        stat = os.stat(self.csv_path)
+        with closing(self.__connect()) as conn:
+            state = conn.execute("SELECT size, mtimeNs, prefixHash FROM SyncState WHERE source = ?",
+                                 (str(self.csv_path),)).fetchone()
+            if state and not full and (state[0], state[1]) == (stat.st_size, stat.st_mtime_ns):
+                return SyncResult()
+
+            with open(self.csv_path, "rb") as file:
+                # The old contents are only hashed, a chunk at a time; if they are
+                # unchanged, parsing starts where the last sync stopped
+                digest = blake2b()
+                append = False
+                if state and not full and state[0] and stat.st_size > state[0]:
+                    append = self.__hash_prefix(file, state[0], digest) == state[2]
+                    if not append:
+                        file.seek(0)
+                        digest = blake2b()
+                lines = HashedLines(file, digest)
+
+                try:
+                    conn.execute("BEGIN IMMEDIATE")
+                    region_codes = {code for (code,) in conn.execute("SELECT code FROM Region")}
+                    if append:
+                        result = self.__apply_tail(conn, csv.reader(lines), region_codes)
+                    else:
+                        result = self.__apply_full(conn, csv.reader(lines), region_codes)
+
+                    # Appending is only safe from a line boundary, so an unterminated
+                    # last line leaves no usable mark and the next sync diffs in full
+                    mark = digest.hexdigest() if lines.terminated else ""
+                    conn.execute("INSERT OR REPLACE INTO SyncState (source, size, mtimeNs, prefixHash) "
+                                 "VALUES (?, ?, ?, ?)",
+                                 (str(self.csv_path), file.tell() if mark else 0, stat.st_mtime_ns, mark))
+                    conn.commit()
+                    return result
+                except sqlite3.Error as e:
+                    conn.rollback()
+                    print(f"Database error: {e}")
+                    raise
+
+    @staticmethod
+    def __hash_prefix(file, size: int, digest) -> str:
+        remaining = size
+        while remaining and (chunk := file.read(min(HASH_CHUNK, remaining))):
+            digest.update(chunk)
+            remaining -= len(chunk)
+        return digest.hexdigest()
+
+    def __apply_tail(self, conn: sqlite3.Connection, lines, region_codes: set[str]) -> SyncResult:
+        result = SyncResult(mode="append")
+        next_occurrence: dict[str, int] = {}
+        to_insert = []
+        for row in lines:
+            values = self.parse_row(row, region_codes)
+            if values is None:
+                result.rejected += 1
+                continue
+            key = self.row_hash(row)
+            if key not in next_occurrence:
+                next_occurrence[key] = conn.execute(
+                    "SELECT COALESCE(MAX(occurrence) + 1, 0) FROM SalesSync WHERE rowHash = ?", (key,)).fetchone()[0]
+            to_insert.append((key, next_occurrence[key], values))
+            next_occurrence[key] += 1
+        result.inserted = self.__insert(conn, to_insert)
+        return result
+
+    def __apply_full(self, conn: sqlite3.Connection, lines, region_codes: set[str]) -> SyncResult:
+        result = SyncResult(mode="full")
+        occurrences: dict[str, int] = {}
+        wanted = {}
+        for line_no, row in enumerate(lines):
+            if line_no == 0 and [field.strip().lower() for field in row] == HEADER:
+                continue
+            values = self.parse_row(row, region_codes)
+            if values is None:
+                result.rejected += 1
+                continue
+            key = self.row_hash(row)
+            occurrence = occurrences.get(key, 0)
+            occurrences[key] = occurrence + 1
+            wanted[(key, occurrence)] = values
+
+        synced = {(key, occurrence): sales_id for key, occurrence, sales_id
+                  in conn.execute("SELECT rowHash, occurrence, salesID FROM SalesSync")}
+        stale = [(sales_id, *key) for key, sales_id in synced.items() if key not in wanted]
+        conn.executemany("DELETE FROM Sales WHERE ID = ?", [(sales_id,) for sales_id, _, _ in stale])
+        conn.executemany("DELETE FROM SalesSync WHERE rowHash = ? AND occurrence = ?",
+                         [key for _, *key in stale])
+        result.deleted = len(stale)
+        result.inserted = self.__insert(
+            conn, [(*key, values) for key, values in wanted.items() if key not in synced])
+        return result
+
+    @staticmethod
+    def __insert(conn: sqlite3.Connection, rows: list) -> int:
+        if not rows:
+            return 0
+        # Sales.ID is AUTOINCREMENT and we hold the write lock, so the new IDs
+        # are exactly the ones above the current maximum, in insertion order
+        last_id = conn.execute("SELECT COALESCE(MAX(ID), 0) FROM Sales").fetchone()[0]
+        conn.executemany("INSERT INTO Sales (amount, salesDate, region) VALUES (?, ?, ?)",
+                         [values for _, _, values in rows])
+        new_ids = [sales_id for (sales_id,) in conn.execute("SELECT ID FROM Sales WHERE ID > ? ORDER BY ID", (last_id,))]
+        conn.executemany("INSERT INTO SalesSync (rowHash, occurrence, salesID) VALUES (?, ?, ?)",
+                         [(key, occurrence, sales_id) for (key, occurrence, _), sales_id in zip(rows, new_ids)])
+        return len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync all_sales.csv into the sales database.")
+    parser.add_argument("--csv", type=Path, help="CSV file (default: psc01_files/all_sales.csv)")
+    parser.add_argument("--db", type=Path, help="SQLite file (default: psc01_db/sales_db.sqlite)")
+    parser.add_argument("--full", action="store_true", help="diff the whole file even if it only grew")
+    args = parser.parse_args()
+
+    sync = SalesSync(FileType(args.csv.name, args.csv.parent) if args.csv else None,
+                     FileType(args.db.name, args.db.parent) if args.db else None)
+    try:
+        result = sync.sync(args.full)
+    except (OSError, sqlite3.Error) as e:
+        print(f"Sync failed: {e}")
+        return
+    print(f"Sync ({result.mode}): {result.inserted} inserted, {result.deleted} deleted, {result.rejected} rejected.")
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,178 @@
 from g12_1_1salestypes import Sales
 from g12_2_2salesdb import SQLiteDBAccess
 
-from datetime import datetime
+from collections import OrderedDict
+from datetime import datetime, date
+from pathlib import Path
+from typing import Optional
+import argparse
+import queue
+import threading
 import tkinter as tk
 from tkinter import ttk, Toplevel, messagebox
 from PIL import Image, ImageTk
 
+class AssetCache:
+    """Loads image assets lazily, relative to this module, and keeps one
+    PhotoImage per (name, size) for the life of the application."""
+
+    def __init__(self, asset_dir: Path) -> None:
+        self._asset_dir = asset_dir
+        self._images: dict[tuple, Optional[ImageTk.PhotoImage]] = {}
+
+    def image(self, name: str, size: tuple[int, int] = None) -> Optional[ImageTk.PhotoImage]:
+        key = (name, size)
+        if key not in self._images:
+            try:
+                img = Image.open(self._asset_dir / name)
+                self._images[key] = ImageTk.PhotoImage(img.resize(size) if size else img)
+            except Exception:
+                self._images[key] = None  # Missing or unreadable; don't retry on every popup
+        return self._images[key]
+
+
+ASSETS = AssetCache(Path(__file__).parent)
+ERROR_ICON = ("rocket.png", (40, 40))
+
+
+class DBWorker:
+    """Runs database calls on one background thread and hands the results back
+    to the Tk thread, which picks them up by polling with after()."""
+
+    def __init__(self, widget: tk.Misc, poll_ms: int = 50) -> None:
+        self._widget = widget
+        self._poll_ms = poll_ms
+        self._requests: queue.Queue = queue.Queue()
+        self._results: queue.Queue = queue.Queue()
+        threading.Thread(target=self.__run, daemon=True).start()
+        self._widget.after(self._poll_ms, self.__poll)
+
+    def submit(self, func, *args, on_done=None, on_error=None) -> None:
+        self._requests.put((func, args, on_done, on_error))
+
+    def stop(self) -> None:
+        self._requests.put(None)
+
+    def __run(self) -> None:
+        while (request := self._requests.get()) is not None:
+            func, args, on_done, on_error = request
+            try:
+                self._results.put((on_done, func(*args)))
+            except Exception as e:
+                self._results.put((on_error, e))
+
+    def __poll(self) -> None:
+        while True:
+            try:
+                callback, value = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if callback:
+                callback(value)
+        self._widget.after(self._poll_ms, self.__poll)
+
+
+class SalesBrowser(Toplevel):
+    """Scrollable view of the Sales table that keeps only a window of rows.
+
+    Pages are fetched by ID (keyset pagination) when the view nears either
+    end of the loaded rows; rows that scroll far out of the window are
+    dropped, so memory stays bounded whatever the table size.
+    """
+    PAGE_SIZE = 100
+    MAX_ROWS = 500
+
+    def __init__(self, parent, db_access: SQLiteDBAccess, db_worker: DBWorker):
+        super().__init__(parent)
+        self.title("Browse Sales")
+        self.geometry("520x400")
+        self._db_access = db_access
+        self._db_worker = db_worker
+        self._loading = False
+        self._more_before = False  # rows were trimmed off the top
+        self._more_after = True
+
+        columns = ("id", "date", "region", "amount")
+        self.tree = ttk.Treeview(self, columns=columns, show="headings")
+        for column, heading, width, anchor in zip(columns, ("ID", "Date", "Region", "Amount"),
+                                                  (70, 110, 110, 140), ("e", "center", "w", "e")):
+            self.tree.heading(column, text=heading)
+            self.tree.column(column, width=width, anchor=anchor)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self.__on_scroll)
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        self.rowconfigure(0, weight=1)
+        self.columnconfigure(0, weight=1)
+
+        self.__fetch(after_id=0)
+
+    def __on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        if self._loading:
+            return
+        rows = self.tree.get_children()
+        if float(last) > 0.9 and self._more_after:
+            self.__fetch(after_id=int(rows[-1]) if rows else 0)
+        elif float(first) < 0.1 and self._more_before and rows:
+            self.__fetch(before_id=int(rows[0]))
+
+    def __fetch(self, after_id: int = 0, before_id: int = None):
+        self._loading = True
+        self._db_worker.submit(self._db_access.retrieve_sales_page, after_id, self.PAGE_SIZE, before_id,
+                               on_done=lambda page: self.__show_page(page, before_id is not None),
+                               on_error=lambda error: setattr(self, '_loading', False))
+
+    def __show_page(self, page: list, prepend: bool):
+        self._loading = False
+        if not self.winfo_exists():
+            return
+        for sales in (reversed(page) if prepend else page):
+            values = (sales['ID'], sales['sales_date'].isoformat(),
+                      sales['region'].name if sales['region'] else "", Sales.format_cents(sales['amount']))
+            self.tree.insert("", 0 if prepend else tk.END, iid=str(sales['ID']), values=values)
+        if prepend:
+            self.tree.yview_scroll(len(page), "units")  # keep the rows the user was looking at in view
+
+        if prepend:
+            self._more_before = len(page) == self.PAGE_SIZE
+        else:
+            self._more_after = len(page) == self.PAGE_SIZE
+
+        rows = self.tree.get_children()
+        excess = len(rows) - self.MAX_ROWS
+        if excess > 0:
+            if prepend:
+                self.tree.delete(*rows[-excess:])
+                self._more_after = True
+            else:
+                self.tree.delete(*rows[:excess])
+                self.tree.yview_scroll(-excess, "units")
+                self._more_before = True
+
+
 class SalesFrame(ttk.Frame):
-    def __init__(self, parent):
+    LIVE_DELAY_MS = 300  # typing pause before a live lookup fires
+    CACHE_SIZE = 128
+
+    def __init__(self, parent, db_access: SQLiteDBAccess = None):
         super().__init__(parent)
         self.grid(padx=20, pady=20)
 
-        self.db_access = SQLiteDBAccess()
+        self.db_access = db_access if db_access else SQLiteDBAccess()
+        self.db_worker = DBWorker(self)
         self.current_sales = None
+        self.current_key = None
+        self._lookup_seq = 0  # bumped whenever a pending lookup becomes stale
+        self._pending = 0
+        self._live_after = None
+        self._lookup_cache: OrderedDict = OrderedDict()  # (date, region) -> lookup result, LRU order
+        self._regions = None  # loaded once, on the worker thread
+        self._batch: dict[int, tuple[Sales, int]] = {}  # ID -> (edited sales, cents when loaded)
+        if not self.db_access.read_only:
+            self.db_worker.submit(self.db_access.ensure_lookup_index)
+            self.db_worker.submit(self.db_access.ensure_report_index)
+            self.db_worker.submit(self.db_access.ensure_sales_summary)
 
         style = ttk.Style()
         if 'clam' in style.theme_names():
@@ -27,11 +187,15 @@ class SalesFrame(ttk.Frame):
         ttk.Label(self, text="Edit Sales Record", style="Header.TLabel").grid(row=0, column=0, columnspan=2, pady=(0, 15))
 
         ttk.Label(self, text="Date (yyyy-mm-dd):").grid(row=1, column=0, sticky="e", pady=5)
-        self.date_entry = ttk.Entry(self)
+        self.date_var = tk.StringVar()
+        self.date_var.trace_add("write", self.__on_input_changed)
+        self.date_entry = ttk.Entry(self, textvariable=self.date_var)
         self.date_entry.grid(row=1, column=1, sticky="ew", pady=5)
 
         ttk.Label(self, text="Region Code:").grid(row=2, column=0, sticky="e", pady=5)
-        self.region_entry = ttk.Entry(self)
+        self.region_var = tk.StringVar()
+        self.region_var.trace_add("write", self.__on_input_changed)
+        self.region_entry = ttk.Entry(self, textvariable=self.region_var)
         self.region_entry.grid(row=2, column=1, sticky="ew", pady=5)
 
         ttk.Label(self, text="Amount:").grid(row=3, column=0, sticky="e", pady=5)
@@ -42,8 +206,21 @@ class SalesFrame(ttk.Frame):
         self.id_entry = ttk.Entry(self, state='readonly')
         self.id_entry.grid(row=4, column=1, sticky="ew", pady=5)
 
+        option_frame = ttk.Frame(self)
+        option_frame.grid(row=5, column=1, sticky="w")
+
+        self.live_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(option_frame, text="Live lookup", variable=self.live_var,
+                        command=self.__on_input_changed).grid(row=0, column=0, padx=(0, 10))
+
+        self.batch_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(option_frame, text="Batch edit", variable=self.batch_var).grid(row=0, column=1, padx=(0, 10))
+
+        self.batch_label = ttk.Label(option_frame, text="Staged: 0")
+        self.batch_label.grid(row=0, column=2)
+
         button_frame = ttk.Frame(self)
-        button_frame.grid(row=5, column=0, columnspan=2, pady=15)
+        button_frame.grid(row=6, column=0, columnspan=2, pady=15)
 
         self.get_button = ttk.Button(button_frame, text="Get Amount", command=self.__get_amount)
         self.get_button.grid(row=0, column=0, padx=5)
@@ -54,8 +231,17 @@ class SalesFrame(ttk.Frame):
         self.save_button = ttk.Button(button_frame, text="Save Changes", command=self.__save_changes, state='disabled')
         self.save_button.grid(row=0, column=2, padx=5)
 
-        self.exit_button = ttk.Button(button_frame, text="Exit", command=self.quit)
-        self.exit_button.grid(row=0, column=3, padx=5)
+        self.browse_button = ttk.Button(button_frame, text="Browse", command=self.__browse)
+        self.browse_button.grid(row=0, column=3, padx=5)
+
+        self.commit_button = ttk.Button(button_frame, text="Commit Batch", command=self.__commit_batch, state='disabled')
+        self.commit_button.grid(row=0, column=4, padx=5)
+
+        self.exit_button = ttk.Button(button_frame, text="Exit", command=self.__exit)
+        self.exit_button.grid(row=0, column=5, padx=5)
+
+        self.status_var = tk.StringVar()
+        ttk.Label(self, textvariable=self.status_var).grid(row=7, column=0, columnspan=2)
 
         self.columnconfigure(1, weight=1)
 
@@ -67,14 +253,9 @@ class SalesFrame(ttk.Frame):
         win.geometry("320x180")
         win.grab_set()
 
-        try:
-            img = Image.open("rocket.png").resize((40, 40))
-            img = ImageTk.PhotoImage(img)
-            logo = ttk.Label(win, image=img, background="white")
-            logo.image = img
-            logo.pack(pady=(15, 5))
-        except Exception:
-            pass
+        img = ASSETS.image(*ERROR_ICON)
+        if img:
+            ttk.Label(win, image=img, background="white").pack(pady=(15, 5))
 
         ttk.Label(win, text=message, background="white", font=("Helvetica", 10)).pack(pady=5)
         ttk.Button(win, text="OK", command=win.destroy).pack(pady=(5, 10))
@@ -88,6 +269,43 @@ class SalesFrame(ttk.Frame):
         self.id_entry.config(state='readonly')
         self.save_button.config(state='disabled')
         self.current_sales = None
+        self.current_key = None
+        self.status_var.set("")
+
+    def __browse(self):
+        SalesBrowser(self, self.db_access, self.db_worker)
+
+    def __exit(self):
+        if self._batch and not messagebox.askyesno(
+                "Uncommitted Changes", f"Discard {len(self._batch)} staged change(s) and exit?"):
+            return
+        self.db_worker.stop()
+        self.quit()
+
+    def __on_input_changed(self, *args):
+        # A lookup still in flight was for the old date/region; drop its result
+        self._lookup_seq += 1
+        if self._live_after:
+            self.after_cancel(self._live_after)
+            self._live_after = None
+        if self.live_var.get():
+            self._live_after = self.after(self.LIVE_DELAY_MS, self.__live_lookup)
+
+    def __live_lookup(self):
+        self._live_after = None
+        key = self.__parse_inputs()
+        if key:
+            self.__request_lookup(key, live=True)
+
+    def __set_busy(self, busy: bool):
+        self._pending += 1 if busy else -1
+        state = 'disabled' if self._pending else 'normal'
+        self.get_button.config(state=state)
+        self.clear_button.config(state=state)
+        self.save_button.config(state='disabled' if self._pending or not self.current_sales
+                                or self.db_access.read_only else 'normal')
+        self.commit_button.config(state='disabled' if self._pending or not self._batch else 'normal')
+        self.winfo_toplevel().config(cursor='watch' if self._pending else '')
 
     def __validate_inputs(self) -> bool:
         date_str = self.date_entry.get().strip()
@@ -106,61 +324,188 @@ class SalesFrame(ttk.Frame):
             self.__popup_error("Invalid Date", f"{date_str} is not in a valid date format 'yyyy-mm-dd'")
             return False
 
-        regions = self.db_access.retrieve_regions()
-        if not regions or not regions.is_valid_region_code(region_code):
-            self.__popup_error("Invalid Region", f"{region_code} is not one of the valid region codes.")
-            return False
-
         return True
 
+    def __parse_inputs(self) -> Optional[tuple[date, str]]:
+        # Quiet version of __validate_inputs for live lookups: half-typed input is not an error
+        date_str = self.date_entry.get().strip()
+        region_code = self.region_entry.get().strip().lower()
+        try:
+            sales_date = datetime.strptime(date_str, "%Y-%m-%d").date()
+        except ValueError:
+            return None
+        if not region_code or not (Sales.MIN_YEAR <= sales_date.year <= Sales.MAX_YEAR):
+            return None
+        return sales_date, region_code
+
+    def __lookup(self, sales_date, region_code):
+        # Runs on the worker thread
+        if self._regions is None:
+            self._regions = self.db_access.retrieve_regions()
+        if not self._regions or not self._regions.is_valid_region_code(region_code):
+            return False, None, None
+        summary = self.db_access.retrieve_sales_summary(
+            region_code, sales_date.year, Sales.cal_quarter(sales_date.month))
+        return True, self.db_access.retrieve_sales_by_date_region(sales_date, region_code), summary
+
+    def __remember(self, key, result):
+        self._lookup_cache[key] = result
+        self._lookup_cache.move_to_end(key)
+        if len(self._lookup_cache) > self.CACHE_SIZE:
+            self._lookup_cache.popitem(last=False)
+
     def __get_amount(self):
         if not self.__validate_inputs():
             return
+        self.__request_lookup(self.__parse_inputs(), live=False)
 
-        date_str = self.date_entry.get().strip()
-        region_code = self.region_entry.get().strip().lower()
-        sales_date = datetime.strptime(date_str, "%Y-%m-%d").date()
+    def __request_lookup(self, key, live: bool):
+        # Live lookups are answered from the cache when possible; "Get Amount" always re-reads
+        if live and key in self._lookup_cache:
+            self._lookup_cache.move_to_end(key)
+            self.__show_sales(key, *self._lookup_cache[key], live=True)
+            return
 
-        sales = self.db_access.retrieve_sales_by_date_region(sales_date, region_code)
-        if not sales:
-            self.__popup_error("No Record", "No sales found.")
+        self._lookup_seq += 1
+        seq = self._lookup_seq
+
+        def on_done(result):
+            if not live:
+                self.__set_busy(False)
+            self.__remember(key, result)
+            if seq == self._lookup_seq:
+                self.__show_sales(key, *result, live=live)
+
+        def on_error(error):
+            if not live:
+                self.__set_busy(False)
+            if seq == self._lookup_seq:
+                if live:
+                    self.status_var.set(f"Lookup failed: {error}")
+                else:
+                    self.__popup_error("Database Error", f"{type(error).__name__}: {error}")
+
+        if not live:
+            self.__set_busy(True)
+        self.db_worker.submit(self.__lookup, *key, on_done=on_done, on_error=on_error)
+
+    def __show_sales(self, key, valid_region, sales, summary, live: bool = False):
+        region_code = key[1]
+        if not valid_region or not sales:
+            if live:
+                # Don't leave the previous record on screen under the new date/region
+                self.current_sales = None
+                self.amount_entry.delete(0, tk.END)
+                self.id_entry.config(state='normal')
+                self.id_entry.delete(0, tk.END)
+                self.id_entry.config(state='readonly')
+                self.save_button.config(state='disabled')
+                self.status_var.set(f"{region_code} is not a valid region code." if not valid_region
+                                    else "No sales found.")
+            elif not valid_region:
+                self.__popup_error("Invalid Region", f"{region_code} is not one of the valid region codes.")
+            else:
+                self.__popup_error("No Record", "No sales found.")
             return
 
         self.current_sales = sales
+        self.current_key = key
+        self.current_original = sales['amount']
+        if summary:
+            self.status_var.set(f"Q{summary['quarter']} {summary['year']} {sales['region'].name}: "
+                                f"{Sales.format_cents(summary['totalCents'])} over {summary['count']} sale(s)")
+        else:
+            self.status_var.set("")
         self.amount_entry.delete(0, tk.END)
-        self.amount_entry.insert(0, str(sales['amount']))
+        self.amount_entry.insert(0, Sales.format_cents(sales['amount'], grouping=False))
 
         self.id_entry.config(state='normal')
         self.id_entry.delete(0, tk.END)
         self.id_entry.insert(0, str(sales['ID']))
         self.id_entry.config(state='readonly')
 
-        self.save_button.config(state='normal')
+        if not self.db_access.read_only:
+            self.save_button.config(state='normal')
 
     def __save_changes(self):
         if not self.current_sales:
             return
 
         try:
-            new_amount = float(self.amount_entry.get())
+            new_amount = Sales.to_cents(self.amount_entry.get())
+        except ValueError:
+            self.__popup_error("Invalid Input", "Please enter a valid number.")
+            return
 
-            if new_amount <= 0:
-                self.__popup_error("Invalid Amount", "Amount must be greater than 0.")
-                return
+        if new_amount <= 0:
+            self.__popup_error("Invalid Amount", "Amount must be greater than 0.")
+            return
 
-            self.current_sales['amount'] = new_amount
-            self.db_access.update_sales(self.current_sales)
+        sales_id = self.current_sales['ID']
+        original = self._batch[sales_id][1] if sales_id in self._batch else self.current_original
+        self.current_sales['amount'] = new_amount
+        self._lookup_cache.pop(self.current_key, None)
+
+        if self.batch_var.get():
+            self._batch[sales_id] = (self.current_sales, original)
+            self.__update_batch_label()
+            self.__clear_field()
+            self.status_var.set(f"Staged ID {sales_id}.")
+            return
+
+        def on_done(result):
+            self.__set_busy(False)
+            self._lookup_cache.clear()  # cached quarter totals are stale now
             messagebox.showinfo("Success", "Sales record updated.")
             self.__clear_field()
 
-        except ValueError:
-            self.__popup_error("Invalid Input", "Please enter a valid number.")
+        def on_error(error):
+            self.__set_busy(False)
+            self.__popup_error("Database Error", f"{type(error).__name__}: {error}")
+
+        self.__set_busy(True)
+        self.db_worker.submit(self.db_access.update_sales, self.current_sales, on_done=on_done, on_error=on_error)
+
+    def __update_batch_label(self):
+        self.batch_label.config(text=f"Staged: {len(self._batch)}")
+        self.commit_button.config(state='normal' if self._batch and not self._pending else 'disabled')
+
+    def __commit_batch(self):
+        if not self._batch:
+            return
+        changes = list(self._batch.values())
+
+        def on_done(conflicts):
+            self.__set_busy(False)
+            if conflicts:
+                # Nothing was written; drop the stale edits so the rest can be committed
+                for sales_id in conflicts:
+                    self._batch.pop(sales_id, None)
+                self.__update_batch_label()
+                self.__popup_error("Conflict", f"Changed since loaded, not saved: ID {', '.join(map(str, conflicts))}")
+                return
+            self._batch.clear()
+            self._lookup_cache.clear()
+            self.__update_batch_label()
+            messagebox.showinfo("Success", f"{len(changes)} sales record(s) updated.")
+
+        def on_error(error):
+            self.__set_busy(False)
+            self.__popup_error("Database Error", f"{type(error).__name__}: {error}")
+
+        self.__set_busy(True)
+        self.db_worker.submit(self.db_access.update_sales_many, changes, on_done=on_done, on_error=on_error)
 
 def main():
+    parser = argparse.ArgumentParser(description="Edit sales amounts.")
+    parser.add_argument("--read-only", action="store_true", help="open the database for lookups only")
+    parser.add_argument("--wal", action="store_true", help="switch the database to WAL mode for concurrent users")
+    args = parser.parse_args()
+
     root = tk.Tk()
-    root.title("Edit Sales Amount")
-    root.geometry("460x340")
-    SalesFrame(root)
+    root.title("View Sales Amount" if args.read_only else "Edit Sales Amount")
+    root.geometry("640x380")
+    SalesFrame(root, SQLiteDBAccess(read_only=args.read_only, wal=args.wal))
     root.mainloop()
 
 if __name__ == "__main__":
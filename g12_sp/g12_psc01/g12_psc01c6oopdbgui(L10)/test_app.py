@@ -0,0 +1,248 @@
+import unittest
+import shutil
+import sqlite3
+import tempfile
+import threading
+from contextlib import closing, redirect_stdout
+from datetime import date
+from io import StringIO
+from pathlib import Path
+from g12_1_1filetypes import FileType
+from g12_2_2salesdb import SQLiteDBAccess, SCHEMA_VERSION
+from g12_2_3salessync import SalesSync
+
+SALES_DB: Path = Path(__file__).parent.parent.parent / 'psc01_db' / 'sales_db.sqlite'
+
+class TestSQLiteDBAccess(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.TemporaryDirectory()
+        shutil.copyfile(SALES_DB, Path(self.data_dir.name) / SALES_DB.name)
+
+    def tearDown(self):
+        self.data_dir.cleanup()
+
+    def open_db(self, **kwargs) -> SQLiteDBAccess:
+        return SQLiteDBAccess(SALES_DB.name, Path(self.data_dir.name), **kwargs)
+
+    def connect(self) -> sqlite3.Connection:
+        """A plain connection, standing in for another writer."""
+        return sqlite3.connect(Path(self.data_dir.name) / SALES_DB.name)
+
+    def assert_summary_matches(self, db: SQLiteDBAccess) -> None:
+        totals = {(row['region'], row['year'], row['quarter']): (row['total_cents'], row['count'])
+                  for row in db.sales_totals(group_by=("region", "year", "quarter"))}
+        summary = {(row['region'], row['year'], row['quarter']): (row['totalCents'], row['count'])
+                   for row in db.retrieve_sales_summaries()}
+        self.assertEqual(summary, totals)
+
+    def test_unmigrated_db_reads_cents(self):
+        db = self.open_db(read_only=True)  # read-only connections never migrate
+        self.assertEqual(db.schema_version, 0)
+        by_page = db.retrieve_sales_page(limit=1000)
+        streamed = list(db.iter_sales(batch_size=2))
+        self.assertTrue(streamed)
+        self.assertEqual([(s['ID'], s['amount'], s['sales_date']) for s in streamed],
+                         [(s['ID'], s['amount'], s['sales_date']) for s in by_page])
+        self.assertTrue(all(isinstance(s['amount'], int) for s in streamed))
+        columnar = next(db.iter_sales(batch_size=1000, columnar=True))
+        self.assertEqual(columnar["amountCents"], [s['amount'] for s in streamed])
+
+    def test_migration_is_opt_in(self):
+        before = [(s['ID'], s['amount']) for s in self.open_db(read_only=True).iter_sales()]
+        self.open_db().ensure_sales_summary()
+        self.assertEqual(self.open_db().schema_version, 0)
+        db = self.open_db(migrate=True)
+        self.assertEqual(db.schema_version, SCHEMA_VERSION)
+        self.assertEqual(self.open_db().schema_version, SCHEMA_VERSION)
+        self.assertEqual([(s['ID'], s['amount']) for s in db.iter_sales()], before)
+
+    def test_retrieve_sales_between_open_range(self):
+        db = self.open_db()
+        everything = db.retrieve_sales_between(None, None, decode=False)
+        self.assertEqual(len(everything), len(db.retrieve_sales_page(limit=1000)))
+        self.assertEqual(everything, sorted(everything, key=lambda row: (row[2], row[0])))
+        first_day = date.fromordinal(everything[0][2])
+        self.assertEqual(len(db.retrieve_sales_between(first_day, None)), len(everything))
+
+    def test_update_sales_many_conflict_writes_nothing(self):
+        db = self.open_db()
+        first, second = db.retrieve_sales_page(limit=2)
+        loaded = {sales['ID']: sales['amount'] for sales in (first, second)}
+        # Another writer changes the second row after it was loaded
+        changed_underneath = db.retrieve_sales_page(after_id=first['ID'], limit=1)[0]
+        changed_underneath['amount'] += 100
+        db.update_sales(changed_underneath)
+        first['amount'] += 1
+        second['amount'] += 1
+        conflicts = db.update_sales_many([(first, loaded[first['ID']]), (second, loaded[second['ID']])])
+        self.assertEqual(conflicts, [second['ID']])
+        stored = {sales['ID']: sales['amount'] for sales in db.retrieve_sales_page(limit=2)}
+        self.assertEqual(stored, {first['ID']: loaded[first['ID']], second['ID']: loaded[second['ID']] + 100})
+
+    def test_sales_summary_follows_writes(self):
+        db = self.open_db()
+        db.ensure_sales_summary()
+        self.assert_summary_matches(db)
+        with closing(self.connect()) as conn, conn:
+            conn.executemany("INSERT INTO Sales (amount, salesDate, region) VALUES (?, ?, ?)",
+                             [(10.05, "2021-12-01", "w"), (0.1, "2022-01-15", "c")])
+        self.assert_summary_matches(db)
+
+        sales = db.retrieve_sales_page(limit=1)[0]
+        sales['amount'] += 1
+        db.update_sales(sales)
+        self.assert_summary_matches(db)
+        with closing(self.connect()) as conn, conn:
+            # Move one sale to another region and another into a different quarter and year
+            conn.execute("UPDATE Sales SET region = 'c' WHERE ID = ?", (sales['ID'],))
+            conn.execute("UPDATE Sales SET salesDate = '2023-04-30' WHERE salesDate = '2022-01-15'")
+        self.assert_summary_matches(db)
+
+        with closing(self.connect()) as conn, conn:
+            conn.execute("DELETE FROM Sales WHERE salesDate = '2023-04-30'")
+            conn.execute("DELETE FROM Sales WHERE ID = ?", (sales['ID'],))
+        self.assert_summary_matches(db)
+        self.assertNotIn(2023, {row['year'] for row in db.retrieve_sales_summaries()})
+
+    def test_summary_triggers_follow_migration(self):
+        db = self.open_db()
+        db.ensure_sales_summary()
+        db.migrate_schema()
+        with closing(self.connect()) as conn, conn:
+            triggers = [sql for (sql,) in conn.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'trg_sales_summary_%'")]
+            # Writers that set only one of amount and amountCents
+            conn.execute("INSERT INTO Sales (amount, salesDate, region) VALUES (10.05, '2021-12-01', 'w')")
+            conn.execute("UPDATE Sales SET amountCents = amountCents + 7 WHERE ID = 1")
+            conn.execute("UPDATE Sales SET amount = amount + 0.01 WHERE ID = 2")
+        self.assertEqual(len(triggers), 3)
+        self.assertTrue(all("amountCents" in sql for sql in triggers))
+        self.assert_summary_matches(db)
+
+    def test_export_partitions(self):
+        with closing(self.connect()) as conn, conn:
+            conn.execute("INSERT INTO Sales (amount, salesDate, region) VALUES (10.05, '2021-10-01', 'w')")
+        out_dir = Path(self.data_dir.name) / 'export'
+        exported = self.open_db().export_partitions(out_dir, workers=2)
+        self.assertEqual({file_path.name: rows for file_path, rows in exported},
+                         {'sales_q4_2021_w.csv': 2, 'sales_q3_2021_e.csv': 1, 'sales_q4_2020_e.csv': 1,
+                          'sales_q4_2020_m.csv': 1, 'sales_q1_2021_w.csv': 1})
+        self.assertEqual(sorted(path.name for path in out_dir.iterdir()),
+                         sorted(file_path.name for file_path, _ in exported))
+        # No header: amount,date lines in date order, as in the quarterly files
+        self.assertEqual((out_dir / 'sales_q4_2021_w.csv').read_text().splitlines(),
+                         ["10.05,2021-10-01", "23456.00,2021-12-22"])
+
+    def test_summary_without_table_is_computed_from_sales(self):
+        db = self.open_db(read_only=True)
+        output = StringIO()
+        with redirect_stdout(output):
+            summaries = db.retrieve_sales_summaries()
+            first = summaries[0]
+            one = db.retrieve_sales_summary(first['region'], first['year'], first['quarter'])
+        self.assertEqual(output.getvalue(), "")
+        self.assertEqual(one, first)
+        self.assert_summary_matches(db)
+
+    def test_update_retries_until_lock_is_released(self):
+        db = self.open_db(busy_timeout_ms=0)
+        sales = db.retrieve_sales_page(limit=1)[0]
+        sales['amount'] += 1
+        blocker = sqlite3.connect(Path(self.data_dir.name) / SALES_DB.name, check_same_thread=False)
+        blocker.execute("BEGIN IMMEDIATE")
+        release = threading.Timer(0.1, blocker.rollback)
+        release.start()
+        output = StringIO()
+        try:
+            with redirect_stdout(output):
+                db.update_sales(sales)
+        finally:
+            release.join()
+            blocker.close()
+        self.assertEqual(output.getvalue(), "")
+        self.assertEqual(db.retrieve_sales_page(limit=1)[0]['amount'], sales['amount'])
+
+    def test_read_only_rejects_writes(self):
+        db = self.open_db(read_only=True)
+        sales = db.retrieve_sales_page(limit=1)[0]
+        original = sales['amount']
+        sales['amount'] += 1
+        output = StringIO()
+        with redirect_stdout(output):
+            with self.assertRaises(sqlite3.OperationalError):
+                db.update_sales(sales)
+            with self.assertRaises(sqlite3.OperationalError):
+                db.update_sales_many([(sales, original)])
+        self.assertEqual(output.getvalue().count("Database error"), 2)  # reported once each, not retried
+        self.assertEqual(db.retrieve_sales_page(limit=1)[0]['amount'], original)
+
+class TestSalesSync(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.TemporaryDirectory()
+        self.dir_path = Path(self.data_dir.name)
+        shutil.copyfile(SALES_DB, self.dir_path / SALES_DB.name)
+        self.csv_path = self.dir_path / 'all_sales.csv'
+        self.sync = SalesSync(FileType(self.csv_path.name, self.dir_path), FileType(SALES_DB.name, self.dir_path))
+
+    def tearDown(self):
+        self.data_dir.cleanup()
+
+    def write_csv(self, text: str, mode: str = "w") -> None:
+        with open(self.csv_path, mode, newline="") as file:
+            file.write(text)
+
+    def sales_rows(self) -> list[tuple]:
+        with closing(sqlite3.connect(self.dir_path / SALES_DB.name)) as conn:
+            return conn.execute("SELECT amount, salesDate, region FROM Sales ORDER BY ID").fetchall()
+
+    def assert_result(self, result, mode: str, inserted: int = 0, deleted: int = 0, rejected: int = 0) -> None:
+        self.assertEqual((result.mode, result.inserted, result.deleted, result.rejected),
+                         (mode, inserted, deleted, rejected))
+
+    def test_full_then_unchanged(self):
+        before = self.sales_rows()
+        self.write_csv("amount,sales_date,region\n"
+                       "12493.0,2020-12-22,w\n"
+                       "13761.0,2021-09-15,e\n"
+                       "0,2021-09-15,e\n")
+        self.assert_result(self.sync.sync(), "full", inserted=2, rejected=1)
+        self.assert_result(self.sync.sync(), "unchanged")
+        self.assert_result(self.sync.sync(full=True), "full", rejected=1)
+        self.assertEqual(self.sales_rows(), before + [(12493.0, "2020-12-22", "w"), (13761.0, "2021-09-15", "e")])
+
+    def test_append_parses_only_the_tail(self):
+        self.write_csv("12493.0,2020-12-22,w\n")
+        self.sync.sync()
+        self.write_csv("13761.0,2021-09-15,e\nbad,row\n", "a")
+        self.assert_result(self.sync.sync(), "append", inserted=1, rejected=1)
+        self.assertEqual(self.sales_rows()[-2:], [(12493.0, "2020-12-22", "w"), (13761.0, "2021-09-15", "e")])
+
+        # A file that grew but whose old part changed is diffed in full
+        self.write_csv("12493.5,2020-12-22,w\n13761.0,2021-09-15,e\n9710.0,2021-05-15,e\n")
+        self.assert_result(self.sync.sync(), "full", inserted=2, deleted=1)
+
+    def test_duplicate_lines_are_separate_sales(self):
+        line = "9710.0,2021-05-15,e\n"
+        self.write_csv(line * 2)
+        self.assert_result(self.sync.sync(), "full", inserted=2)
+        self.write_csv(line, "a")
+        self.assert_result(self.sync.sync(), "append", inserted=1)
+        self.assertEqual(self.sales_rows().count((9710.0, "2021-05-15", "e")), 3)
+
+        # Removing copies deletes exactly that many of the synced sales
+        self.write_csv(line * 2 + "8934.0,2021-08-08,c\n")
+        self.assert_result(self.sync.sync(), "full", inserted=1, deleted=1)
+        self.write_csv(line)
+        self.assert_result(self.sync.sync(), "full", deleted=2)
+        self.assertEqual(self.sales_rows().count((9710.0, "2021-05-15", "e")), 1)
+
+    def test_full_sync_deletes_only_synced_sales(self):
+        before = self.sales_rows()
+        self.write_csv("12493.0,2020-12-22,w\n13761.0,2021-09-15,e\n")
+        self.sync.sync()
+        self.write_csv("13761.0,2021-09-15,e\n")
+        self.assert_result(self.sync.sync(), "full", deleted=1)
+        self.assertEqual(self.sales_rows(), before + [(13761.0, "2021-09-15", "e")])
+
+if __name__ == "__main__":
+    unittest.main()
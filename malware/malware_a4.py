@@ -1,5 +1,13 @@
 import os
+import sys
 import csv
+import mmap
+import time
+import struct
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from pathlib import Path
 
 # Dictionary of known file signatures (magic numbers)
@@ -16,11 +24,81 @@ FILE_SIGNATURES = {
     "52617221": ("RAR Archive", ".rar"),
 }
 
+# Same signatures as raw bytes, so headers can be matched without hex-encoding them
+BYTE_SIGNATURES = tuple((bytes.fromhex(sig), info) for sig, info in FILE_SIGNATURES.items())
+
+# Second-stage markers for container formats, checked in order; the first rule whose
+# entries are all present wins. ZIP rules match central directory entry name prefixes.
+ZIP_CONTAINER_TYPES = (
+    (("AndroidManifest.xml", "classes"), "Android Package (APK)", ".apk"),
+    (("META-INF/container.xml", "mimetype"), "EPUB eBook", ".epub"),
+    (("content.xml", "mimetype"), "OpenDocument File", ".odt, .ods, .odp"),
+    (("word/",), "Microsoft Word Document (DOCX)", ".docx"),
+    (("xl/",), "Microsoft Excel Workbook (XLSX)", ".xlsx"),
+    (("ppt/",), "Microsoft PowerPoint Presentation (PPTX)", ".pptx"),
+    (("META-INF/MANIFEST.MF",), "Java Archive (JAR)", ".jar"),
+)
+# OLE rules match stream names in the first directory sector
+OLE_CONTAINER_TYPES = (
+    (("WordDocument",), "Microsoft Word Document (Pre-2007)", ".doc"),
+    (("Workbook",), "Microsoft Excel Workbook (Pre-2007)", ".xls"),
+    (("Book",), "Microsoft Excel Workbook (Pre-2007)", ".xls"),
+    (("PowerPoint Document",), "Microsoft PowerPoint Presentation (Pre-2007)", ".ppt"),
+    (("__substg1.0_",), "Outlook Message", ".msg"),
+    (("VisioDocument",), "Microsoft Visio Drawing (Pre-2013)", ".vsd"),
+)
+CSV_HEADER = ["Filename", "Hex Signature", "Detected Type", "Suggested Extension", "New File Path"]
+ZIP_EOCD_SIGNATURE = b"PK\x05\x06"
+ZIP_CENTRAL_SIGNATURE = b"PK\x01\x02"
+ZIP_EOCD_MAX_SEARCH = 22 + 0xFFFF  # Fixed record plus the longest archive comment
+
 def read_file_signature(file_path, num_bytes=8):
     """Read the first few bytes of a file (magic number)."""
     with open(file_path, "rb") as f:
         return f.read(num_bytes).hex().upper()
 
+if hasattr(os, "preadv"):
+    def _pread_into(fd, view):
+        return os.preadv(fd, [view], 0)
+elif hasattr(os, "pread"):
+    def _pread_into(fd, view):
+        data = os.pread(fd, len(view), 0)
+        view[:len(data)] = data
+        return len(data)
+else:  # Windows has no positional reads
+    def _pread_into(fd, view):
+        data = os.read(fd, len(view))
+        view[:len(data)] = data
+        return len(data)
+
+class SignatureReader:
+    """Read file headers into one reused buffer instead of allocating per file."""
+
+    def __init__(self, num_bytes=8):
+        self._buffer = bytearray(num_bytes)
+        self._view = memoryview(self._buffer)
+        self.length = 0
+
+    def read(self, file_path):
+        """Read the magic number of a file into the buffer and return the byte count."""
+        fd = os.open(file_path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+        try:
+            self.length = _pread_into(fd, self._view)
+        finally:
+            os.close(fd)
+        return self.length
+
+    def identify(self):
+        """Identify the buffered header against the byte signatures."""
+        for sig, info in BYTE_SIGNATURES:
+            if self._buffer.startswith(sig, 0, self.length):
+                return info
+        return "Unknown", "Unknown"
+
+    def hex_signature(self):
+        """Hex string of the buffered header, matching read_file_signature()."""
+        return self._view[:self.length].hex().upper()
+
 def identify_file_type(hex_signature):
     """Identify file type and extension based on magic numbers."""
     for sig, (file_type, extension) in FILE_SIGNATURES.items():
@@ -28,33 +106,194 @@ def identify_file_type(hex_signature):
             return file_type, extension
     return "Unknown", "Unknown"
 
-def analyze_files(directory):
+def _match_container(names, rules):
+    """Return (type, extension) of the first rule whose markers all prefix some entry name."""
+    for markers, file_type, extension in rules:
+        if all(any(name.startswith(marker) for name in names) for marker in markers):
+            return file_type, extension
+    return None
+
+def _zip_entry_names(view):
+    """Entry names from the ZIP central directory; no entry data is read or decompressed."""
+    eocd = view.rfind(ZIP_EOCD_SIGNATURE, max(0, len(view) - ZIP_EOCD_MAX_SEARCH))
+    if eocd < 0:
+        return []
+    count, cd_size, cd_offset = struct.unpack_from("<HLL", view, eocd + 10)
+    if cd_offset + cd_size > eocd:
+        return []  # ZIP64 or a damaged archive; leave the header-only result
+    names = []
+    pos = cd_offset
+    for _ in range(count):
+        if view[pos:pos + 4] != ZIP_CENTRAL_SIGNATURE:
+            break
+        name_len, extra_len, comment_len = struct.unpack_from("<3H", view, pos + 28)
+        names.append(view[pos + 46:pos + 46 + name_len].decode("utf-8", "replace"))
+        pos += 46 + name_len + extra_len + comment_len
+    return names
+
+def _ole_stream_names(view):
+    """Entry names from the first OLE directory sector."""
+    sector_shift = struct.unpack_from("<H", view, 30)[0]
+    first_dir_sector = struct.unpack_from("<L", view, 48)[0]
+    start = (first_dir_sector + 1) << sector_shift
+    end = min(start + (1 << sector_shift), len(view))
+    names = []
+    for pos in range(start, end - 127, 128):
+        name_len = struct.unpack_from("<H", view, pos + 64)[0]
+        if 2 <= name_len <= 64:
+            names.append(view[pos:pos + name_len - 2].decode("utf-16-le", "replace"))
+    return names
+
+def inspect_container(file_path, file_type, extension):
+    """Refine a ZIP or OLE detection from its directory structures, read through mmap."""
+    if file_type == FILE_SIGNATURES["504B0304"][0]:
+        list_names, rules = _zip_entry_names, ZIP_CONTAINER_TYPES
+    elif file_type == FILE_SIGNATURES["D0CF11E0"][0]:
+        list_names, rules = _ole_stream_names, OLE_CONTAINER_TYPES
+    else:
+        return file_type, extension
+
+    try:
+        with open(file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            refined = _match_container(list_names(view), rules)
+    except (OSError, ValueError, struct.error):
+        refined = None  # Empty, truncated or unreadable file
+    return refined or (file_type, extension)
+
+def analyze_file(reader, filename, file_path, deep=False, renamed=None):
+    """Identify one file, rename it if its type is recognized, and return its result row.
+    New names are added to `renamed` before the rename, so a scan still listing
+    the directory can skip them."""
+    reader.read(file_path)
+    file_type, extension = reader.identify()
+    if deep:
+        file_type, extension = inspect_container(file_path, file_type, extension)
+    hex_sig = reader.hex_signature()
+
+    # Rename file if type is recognized
+    if extension != "Unknown":
+        new_file_path = file_path + extension.split(",")[0]  # Use first suggested extension
+        if renamed is not None:
+            renamed.add(os.path.basename(new_file_path))
+        os.rename(file_path, new_file_path)
+        return filename, hex_sig, file_type, extension, new_file_path
+    return filename, hex_sig, file_type, extension, "Not Renamed"
+
+def list_files(directory, renamed=frozenset()):
+    """Yield (name, path) of the regular files in a directory as they are read.
+    A file renamed during the scan may be listed again under its new name, so
+    names in `renamed` are skipped."""
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.name not in renamed:  # Skip directories
+                yield entry.name, entry.path
+
+def analyze_files(directory, deep=False):
     """Analyze all files in a directory to determine file types."""
-    results = []
-    for filename in os.listdir(directory):
-        file_path = os.path.join(directory, filename)
+    reader = SignatureReader()
+    renamed = set()
+    return [analyze_file(reader, filename, file_path, deep, renamed)
+            for filename, file_path in list_files(directory, renamed)]
+
+class ScanStats:
+    """Throughput and per-file latency counters for the async pipeline."""
+
+    def __init__(self):
+        self.files = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.elapsed = 0.0
+
+    def record(self, latency):
+        self.files += 1
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+
+    @property
+    def files_per_sec(self):
+        return self.files / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def mean_latency(self):
+        return self.total_latency / self.files if self.files else 0.0
 
-        if not os.path.isfile(file_path):
-            continue  # Skip directories
+_worker_state = threading.local()
+LIST_BATCH = 256  # directory entries the async producer reads per executor call
 
-        hex_sig = read_file_signature(file_path)
-        file_type, extension = identify_file_type(hex_sig)
+def _analyze_in_worker(filename, file_path, deep, renamed):
+    """Run analyze_file on an executor thread with that thread's own reusable buffer."""
+    if not hasattr(_worker_state, "reader"):
+        _worker_state.reader = SignatureReader()
+    return analyze_file(_worker_state.reader, filename, file_path, deep, renamed)
 
-        # Rename file if type is recognized
-        if extension != "Unknown":
-            new_file_path = file_path + extension.split(",")[0]  # Use first suggested extension
-            os.rename(file_path, new_file_path)
-            results.append((filename, hex_sig, file_type, extension, new_file_path))
-        else:
-            results.append((filename, hex_sig, file_type, extension, "Not Renamed"))
+async def analyze_files_async(directory, output_file="file_analysis_results.csv",
+                              workers=8, queue_size=64, deep=False):
+    """Analyze a directory through bounded queues, streaming rows into the CSV file.
 
-    return results
+    Header reads run on a thread pool of `workers`. Both queues hold at most
+    `queue_size` items, so a slow disk or a slow writer stalls the stages in front
+    of it instead of letting results pile up in memory.
+    """
+    loop = asyncio.get_running_loop()
+    stats = ScanStats()
+    pending = asyncio.Queue(maxsize=queue_size)
+    finished = asyncio.Queue(maxsize=queue_size)
+    renamed = set()
+    start = time.perf_counter()
+
+    async def produce(executor):
+        # The listing is read a batch at a time, so memory stays flat however big the directory
+        entries = list_files(directory, renamed)
+        while batch := await loop.run_in_executor(executor, lambda: list(islice(entries, LIST_BATCH))):
+            for item in batch:
+                await pending.put(item)
+        for _ in range(workers):
+            await pending.put(None)
+
+    async def work(executor):
+        while (item := await pending.get()) is not None:
+            queued = time.perf_counter()
+            row = await loop.run_in_executor(executor, _analyze_in_worker, *item, deep, renamed)
+            stats.record(time.perf_counter() - queued)
+            await finished.put(row)
+
+    async def write():
+        with open(output_file, mode="w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(CSV_HEADER)
+            while (row := await finished.get()) is not None:
+                writer.writerow(row)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        writer_task = asyncio.create_task(write())
+        stage_tasks = [asyncio.create_task(produce(executor)),
+                       *(asyncio.create_task(work(executor)) for _ in range(workers))]
+        stages = asyncio.gather(*stage_tasks)
+        tasks = [writer_task, *stage_tasks, stages]
+        try:
+            # The writer only returns after the sentinel, so if it finishes first it
+            # failed; nobody would drain `finished` and the workers would block on it
+            await asyncio.wait([stages, writer_task], return_when=asyncio.FIRST_COMPLETED)
+            if writer_task.done():
+                writer_task.result()
+            await stages
+            sentinel = asyncio.create_task(finished.put(None))
+            tasks.append(sentinel)
+            await asyncio.wait([sentinel, writer_task], return_when=asyncio.FIRST_COMPLETED)
+            await writer_task
+        finally:
+            # After a failure, stop whatever is still waiting on a queue
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    stats.elapsed = time.perf_counter() - start
+    return stats
 
 def save_results_to_csv(results, output_file="file_analysis_results.csv"):
     """Save analysis results to a CSV file."""
     with open(output_file, mode="w", newline="") as file:
         writer = csv.writer(file)
-        writer.writerow(["Filename", "Hex Signature", "Detected Type", "Suggested Extension", "New File Path"])
+        writer.writerow(CSV_HEADER)
         writer.writerows(results)
 
 def main():
@@ -64,8 +303,17 @@ def main():
         print("Error: Directory not found!")
         return
 
+    deep = "--deep" in sys.argv[1:]  # Refine ZIP/OLE containers (DOCX, XLSX, JAR, APK, ...)
+
     print("\nAnalyzing files...\n")
-    results = analyze_files(directory)
+    if "--async" in sys.argv[1:]:  # Pipelined mode for remote-mounted evidence stores
+        stats = asyncio.run(analyze_files_async(directory, deep=deep))
+        print("\n✅ Analysis complete! Results saved to 'file_analysis_results.csv'.\n")
+        print(f"Files: {stats.files} | {stats.files_per_sec:,.0f} files/sec | "
+              f"Latency mean {stats.mean_latency * 1000:.2f} ms, max {stats.max_latency * 1000:.2f} ms")
+        return
+
+    results = analyze_files(directory, deep)
 
     save_results_to_csv(results)
 